@@ -0,0 +1,88 @@
+"""Bytes on the wire and CPU per response for the compression middleware.
+
+Usage: python bench_compression.py [--iterations 200]
+
+Payloads mimic the JSON list endpoints (/api/subjects, /api/models,
+/api/questions/{model_id}, /api/performance) at a few catalog sizes.
+"""
+import argparse
+import json
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def subjects(n):
+    return [{"id": str(uuid.uuid4()), "name": f"Subject {i}", "description": "Explore detailed 3D models of human body parts",
+             "category": ["anatomy", "automobile", "physics"][i % 3], "created_at": now()} for i in range(n)]
+
+
+def models(n):
+    return [{"id": str(uuid.uuid4()), "title": f"Model {i}", "description": "Transmission system showing gear mechanics",
+             "model_url": f"https://example.com/models/{i}.glb", "subject_id": str(uuid.uuid4()),
+             "labels": ["Gearbox", "Transmission", "Mechanics"], "created_at": now()} for i in range(n)]
+
+
+def questions(n):
+    return [{"id": str(uuid.uuid4()), "subject_id": str(uuid.uuid4()), "model_id": str(uuid.uuid4()),
+             "question_text": "Which chamber pumps oxygenated blood to the body?",
+             "options": ["Right Atrium", "Left Atrium", "Right Ventricle", "Left Ventricle"],
+             "correct_answer": 3, "difficulty": "medium", "created_at": now()} for i in range(n)]
+
+
+def performance(n):
+    return {"total_assessments": 120, "correct_answers": 80, "accuracy": 0.66,
+            "subject_wise_performance": {f"Subject {i}": {"total": 40, "correct": 30, "subject_id": str(uuid.uuid4()),
+                                                          "accuracy": 0.75} for i in range(n)},
+            "weak_topics": [], "avg_time_spent": 12.5}
+
+
+def gzip(data, level):
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return c.compress(data) + c.flush()
+
+
+def encoders():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda data, level=level: gzip(data, level)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("subjects x10", subjects(10)),
+        ("models x50", models(50)),
+        ("questions x20", questions(20)),
+        ("questions x500", questions(500)),
+        ("performance x10", performance(10)),
+    ]
+    print(f"{'payload':<18}{'encoding':<10}{'bytes':>10}{'ratio':>8}{'cpu us/resp':>14}")
+    for name, payload in cases:
+        data = json.dumps(payload).encode()
+        print(f"{name:<18}{'identity':<10}{len(data):>10}{1.0:>8.2f}{0:>14.1f}")
+        for label, encode in encoders():
+            start = time.process_time()
+            for _ in range(args.iterations):
+                out = encode(data)
+            cpu_us = (time.process_time() - start) / args.iterations * 1e6
+            print(f"{'':<18}{label:<10}{len(out):>10}{len(data) / len(out):>8.2f}{cpu_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUS = os.environ.get('CACHE_BUS', 'local')  # local, mongo or none
+CACHE_BUS_DIR = Path(os.environ.get('CACHE_BUS_DIR', '/tmp/ar-learn-cache-bus'))
+CACHE_EVENT_RETENTION_SECONDS = int(os.environ.get('CACHE_EVENT_RETENTION_SECONDS', '3600'))
+
+# Change stream errors meaning the resume point fell off the oplog
+HISTORY_LOST_CODES = {136, 260, 280, 286}
+
+
+class CoherentCache:
+    """Small LRU whose entries live for `ttl` while the invalidation bus is
+    healthy and only `degraded_ttl` while it is down, so a broken bus costs
+    freshness bounded by the short TTL rather than serving stale data forever.
+
+    `generation` changes on every invalidation. A fill reads it before its
+    query and stores with `put(key, value, generation)`, which drops the
+    result if the cache was invalidated meanwhile: the query may have run
+    before the write that caused the invalidation.
+    """
+
+    def __init__(self, is_healthy, ttl=3600, degraded_ttl=30, maxsize=1024):
+        self.is_healthy = is_healthy
+        self.ttl = ttl
+        self.degraded_ttl = degraded_ttl
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.generation = 0
+
+    def get(self, key, default=None):
+        item = self.data.get(key)
+        if item is None:
+            return default
+        ttl = self.ttl if self.is_healthy() else self.degraded_ttl
+        if time.monotonic() - item[0] > ttl:
+            del self.data[key]
+            return default
+        self.data.move_to_end(key)
+        return item[1]
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def put(self, key, value, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+        self.data[key] = (time.monotonic(), value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        self.generation += 1
+        item = self.data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self.generation += 1
+        self.data.clear()
+
+
+class InvalidationBus:
+    """Broadcasts invalidation events between worker processes.
+
+    Every event carries its origin worker and a per-origin sequence number.
+    A receiver that sees a gap in some origin's sequence has missed events,
+    so it runs the "*" (flush everything) handlers instead of trusting its
+    caches. Workers never receive their own events.
+    """
+
+    healthy = False
+
+    def __init__(self, worker_id=None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.handlers = {}
+        self.seq = 0
+        self.last_seen = {}
+
+    def subscribe(self, topic, handler):
+        self.handlers.setdefault(topic, []).append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, topic, **payload):
+        self.seq += 1
+        event = {"origin": self.worker_id, "version": self.seq, "topic": topic, "payload": payload}
+        try:
+            await self._send(event)
+        except Exception:
+            logger.warning(f"Publishing {topic} invalidation failed", exc_info=True)
+
+    async def _send(self, event):
+        pass
+
+    async def _call(self, topic, event):
+        for handler in self.handlers.get(topic, ()):
+            try:
+                result = handler(event.get("payload", {}))
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Cache invalidation handler for {topic} failed")
+
+    async def flush_all(self):
+        await self._call("*", {"payload": {}})
+
+    async def dispatch(self, event):
+        origin = event["origin"]
+        if origin == self.worker_id:
+            return
+        previous = self.last_seen.get(origin)
+        self.last_seen[origin] = event["version"]
+        if previous is not None and event["version"] > previous + 1:
+            logger.warning(f"Missed {event['version'] - previous - 1} invalidation(s) from {origin}; flushing caches")
+            await self.flush_all()
+        await self._call(event["topic"], event)
+
+
+class NullBus(InvalidationBus):
+    """No bus: caches always use their degraded TTL."""
+
+
+class LocalBroadcastBus(InvalidationBus):
+    """Unix datagram sockets in a shared directory, one per worker.
+
+    Publishing sends the event to every other socket in the directory;
+    sockets whose worker has exited refuse the datagram and are removed.
+    """
+
+    def __init__(self, directory=CACHE_BUS_DIR, worker_id=None):
+        super().__init__(worker_id)
+        self.directory = Path(directory)
+        self.path = None
+        self.sock = None
+
+    async def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{self.worker_id}.sock"
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(str(self.path))
+        self.sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.sock.fileno(), self._on_readable)
+        self.healthy = True
+
+    async def stop(self):
+        self.healthy = False
+        if self.sock is not None:
+            asyncio.get_running_loop().remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            asyncio.ensure_future(self.dispatch(event))
+
+    async def _send(self, event):
+        data = json.dumps(event).encode()
+        for peer in self.directory.glob("*.sock"):
+            if peer == self.path:
+                continue
+            try:
+                self.sock.sendto(data, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                peer.unlink(missing_ok=True)
+            except BlockingIOError:
+                # Peer's receive buffer is full; it will see the sequence gap and flush
+                pass
+
+
+class MongoChangeStreamBus(InvalidationBus):
+    """Events are inserted into `cache_events` and read back through a change
+    stream (needs a replica set; a single-node one is fine)."""
+
+    def __init__(self, db, worker_id=None):
+        super().__init__(worker_id)
+        self.db = db
+        self._task = None
+
+    async def start(self):
+        await self.db.cache_events.create_index("created_at", expireAfterSeconds=CACHE_EVENT_RETENTION_SECONDS)
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        self.healthy = False
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _send(self, event):
+        await self.db.cache_events.insert_one(dict(event, created_at=datetime.now(timezone.utc)))
+
+    async def _watch(self):
+        resume_token = None
+        missed = False
+        backoff = 1
+        while True:
+            try:
+                async with self.db.cache_events.watch(
+                    [{"$match": {"operationType": "insert"}}], resume_after=resume_token
+                ) as stream:
+                    self.healthy = True
+                    backoff = 1
+                    if missed:
+                        # Down with nothing to resume from: events may have been lost
+                        await self.flush_all()
+                        missed = False
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        await self.dispatch(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.healthy = False
+                if e.code in HISTORY_LOST_CODES:
+                    resume_token = None
+                logger.warning(f"Cache bus change stream failed: {e}")
+                missed = missed or resume_token is None
+            except Exception as e:
+                self.healthy = False
+                logger.warning(f"Cache bus change stream failed: {e}")
+                missed = missed or resume_token is None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+def create_bus(db, kind=None):
+    kind = kind or CACHE_BUS
+    if kind == 'mongo':
+        return MongoChangeStreamBus(db)
+    if kind == 'local':
+        return LocalBroadcastBus()
+    return NullBus()
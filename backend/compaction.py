@@ -0,0 +1,136 @@
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '90'))
+ARCHIVE_MODE = os.environ.get('ARCHIVE_MODE', 'collection')  # collection or file
+ARCHIVE_DIR = Path(os.environ.get('ARCHIVE_DIR', Path(__file__).parent / 'archive'))
+COMPACTION_BATCH_SIZE = int(os.environ.get('COMPACTION_BATCH_SIZE', '5000'))
+COMPACTION_INTERVAL_SECONDS = int(os.environ.get('COMPACTION_INTERVAL_SECONDS', '3600'))
+
+# Raw rows older than the cutoff are folded into one summary document per
+# (user_id, subject_id) holding the same counters PerformanceStats is built from.
+
+
+def empty_counters():
+    return {"total": 0, "correct": 0, "time_spent_total": 0, "time_spent_count": 0}
+
+
+def summarize(rows):
+    summaries = {}
+    for r in rows:
+        key = (r['user_id'], r['subject_id'])
+        s = summaries.get(key)
+        if s is None:
+            s = summaries[key] = empty_counters()
+            s["first_result_at"] = r['created_at']
+            s["last_result_at"] = r['created_at']
+        s["total"] += 1
+        if r['is_correct']:
+            s["correct"] += 1
+        # Same predicate as load_subject_counters' $gt: 0, so compacting doesn't move the average
+        if (r.get('time_spent') or 0) > 0:
+            s["time_spent_total"] += r['time_spent']
+            s["time_spent_count"] += 1
+        s["first_result_at"] = min(s["first_result_at"], r['created_at'])
+        s["last_result_at"] = max(s["last_result_at"], r['created_at'])
+    return summaries
+
+
+def write_archive_file(rows):
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    path = ARCHIVE_DIR / f"assessment_results-{rows[0]['created_at'][:10]}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for r in rows:
+            f.write(json.dumps(r, default=str))
+            f.write('\n')
+    return path
+
+
+async def compact_results(client, db, older_than_days=None, batch_size=None):
+    older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or COMPACTION_BATCH_SIZE
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    stats = {"cutoff": cutoff, "batches": 0, "archived": 0, "summaries_updated": 0}
+
+    while True:
+        rows = await db.assessment_results.find(
+            {"created_at": {"$lt": cutoff}}, {"_id": 0}
+        ).sort("created_at", 1).limit(batch_size).to_list(batch_size)
+        if not rows:
+            break
+
+        if ARCHIVE_MODE == 'file':
+            # Written before the transaction: a failed commit leaves a duplicate
+            # file behind, never a lost row.
+            write_archive_file(rows)
+
+        now = datetime.now(timezone.utc).isoformat()
+        summaries = summarize(rows)
+        ops = [
+            UpdateOne(
+                {"user_id": user_id, "subject_id": subject_id},
+                {
+                    "$inc": {k: s[k] for k in ("total", "correct", "time_spent_total", "time_spent_count")},
+                    "$min": {"first_result_at": s["first_result_at"]},
+                    "$max": {"last_result_at": s["last_result_at"]},
+                    "$set": {"updated_at": now},
+                },
+                upsert=True,
+            )
+            for (user_id, subject_id), s in summaries.items()
+        ]
+        ids = [r['id'] for r in rows]
+
+        # Summary increments and the removal of raw rows must land together,
+        # otherwise a retry would count the same results twice.
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                if ARCHIVE_MODE != 'file':
+                    await db.assessment_results_archive.insert_many(
+                        [dict(r, archived_at=now) for r in rows], ordered=False, session=session
+                    )
+                await db.performance_summaries.bulk_write(ops, ordered=False, session=session)
+                await db.assessment_results.delete_many({"id": {"$in": ids}}, session=session)
+
+        stats["batches"] += 1
+        stats["archived"] += len(rows)
+        stats["summaries_updated"] += len(ops)
+        if len(rows) < batch_size:
+            break
+
+    return stats
+
+
+async def load_subject_counters(db, user_id):
+    """Per-subject counters for a user: compacted summaries plus recent raw rows."""
+    counters = {}
+    async for s in db.performance_summaries.find({"user_id": user_id}, {"_id": 0}):
+        c = counters.setdefault(s['subject_id'], empty_counters())
+        for k in c:
+            c[k] += s.get(k, 0)
+
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$group": {
+            "_id": "$subject_id",
+            "total": {"$sum": 1},
+            "correct": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
+            "time_spent_total": {"$sum": {"$cond": [{"$gt": ["$time_spent", 0]}, "$time_spent", 0]}},
+            "time_spent_count": {"$sum": {"$cond": [{"$gt": ["$time_spent", 0]}, 1, 0]}},
+        }},
+    ]
+    async for r in db.assessment_results.aggregate(pipeline):
+        c = counters.setdefault(r['_id'], empty_counters())
+        for k in c:
+            c[k] += r[k]
+
+    return counters
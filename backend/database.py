@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+import time
+
+import bcrypt
+import certifi
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+MONGO_URL = os.environ.get('MONGO_URL', '')
+DB_NAME = os.environ.get('DB_NAME', 'ar_learning_db')
+
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+IMPORT_STAGING_TTL_SECONDS = int(os.environ.get('IMPORT_STAGING_TTL_SECONDS', '86400'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '30000'))
+# zlib ships with pymongo; snappy/zstd need python-snappy/zstandard installed.
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zlib')
+
+
+def create_client():
+    if not MONGO_URL:
+        raise RuntimeError("MONGO_URL is not set; put the connection string in the environment or backend/.env")
+    kwargs = dict(
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    )
+    if MONGO_COMPRESSORS:
+        kwargs['compressors'] = MONGO_COMPRESSORS
+    if MONGO_URL.startswith('mongodb+srv://') or 'tls=true' in MONGO_URL:
+        kwargs['tlsCAFile'] = certifi.where()
+    return AsyncIOMotorClient(MONGO_URL, **kwargs)
+
+
+async def ping(client):
+    start = time.perf_counter()
+    await client.admin.command('ping')
+    return (time.perf_counter() - start) * 1000
+
+
+async def open_min_connections(client):
+    # Concurrent pings each check out their own socket, so the TLS handshakes
+    # for the whole minimum pool happen here rather than on user requests.
+    await asyncio.gather(*(ping(client) for _ in range(max(MONGO_MIN_POOL_SIZE, 1))))
+
+
+def bcrypt_self_test():
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(b'self-test', bcrypt.gensalt())
+    if not bcrypt.checkpw(b'self-test', hashed) or bcrypt.checkpw(b'wrong', hashed):
+        raise RuntimeError("bcrypt self-test failed")
+    return (time.perf_counter() - start) * 1000
+
+
+async def ensure_indexes(db):
+    await db.users.create_index("id")
+    await db.users.create_index("email")
+    await db.subjects.create_index("id")
+    await db.models.create_index("id")
+    await db.models.create_index("subject_id")
+    await db.questions.create_index("id")
+    await db.questions.create_index([("model_id", 1), ("difficulty", 1)])
+    await db.assessment_results.create_index("created_at")
+    await db.assessment_results.create_index([("user_id", 1), ("subject_id", 1), ("created_at", -1)])
+    await db.performance_summaries.create_index([("user_id", 1), ("subject_id", 1)], unique=True)
+    await db.review_schedules.create_index([("user_id", 1), ("question_id", 1)], unique=True)
+    await db.review_schedules.create_index([("user_id", 1), ("due_at", 1)])
+    await db.translations.create_index([("model_id", 1), ("lang", 1), ("source_hash", 1)], unique=True)
+    await db.question_imports.create_index([("import_id", 1), ("seq", 1)])
+    # Staged chunks of imports that failed or were cancelled
+    await db.question_imports.create_index("created_at", expireAfterSeconds=IMPORT_STAGING_TTL_SECONDS)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases = []
+        self._start = time.perf_counter()
+
+    async def run(self, name, coro):
+        start = time.perf_counter()
+        result = await coro
+        self.phases.append((name, (time.perf_counter() - start) * 1000))
+        return result
+
+    def summary(self):
+        total = (time.perf_counter() - self._start) * 1000
+        parts = ', '.join(f"{name}={ms:.0f}ms" for name, ms in self.phases)
+        return f"Startup completed in {total:.0f}ms ({parts})"
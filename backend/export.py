@@ -0,0 +1,190 @@
+import asyncio
+import csv
+import io
+import os
+from datetime import timezone
+
+from cachetools import LRUCache
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '5000'))
+EXPORT_LOOKUP_CACHE_SIZE = int(os.environ.get('EXPORT_LOOKUP_CACHE_SIZE', '50000'))
+
+COLUMNS = [
+    "result_id", "created_at",
+    "user_id", "user_name", "user_email",
+    "subject_id", "subject_name",
+    "model_id", "model_title",
+    "question_id", "question_text",
+    "selected_answer", "is_correct", "time_spent",
+]
+
+RESULT_PROJECTION = {
+    "_id": 0, "id": 1, "created_at": 1, "user_id": 1, "subject_id": 1, "model_id": 1,
+    "question_id": 1, "selected_answer": 1, "is_correct": 1, "time_spent": 1,
+}
+
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def utc_isoformat(dt):
+    """ISO string comparable with stored `created_at` values; naive input is taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def csv_safe(row):
+    return {
+        k: "'" + v if isinstance(v, str) and v.startswith(FORMULA_PREFIXES) else v
+        for k, v in row.items()
+    }
+
+
+class LookupCache:
+    """Bounded id -> fields cache filled with one `$in` query per batch of misses."""
+
+    def __init__(self, collection, fields, maxsize=EXPORT_LOOKUP_CACHE_SIZE):
+        self.collection = collection
+        self.fields = fields
+        self.cache = LRUCache(maxsize=maxsize)
+
+    async def resolve(self, ids):
+        missing = {i for i in ids if i not in self.cache}
+        if missing:
+            projection = {"_id": 0, "id": 1, **{f: 1 for f in self.fields}}
+            async for doc in self.collection.find({"id": {"$in": list(missing)}}, projection):
+                self.cache[doc['id']] = doc
+                missing.discard(doc['id'])
+            for i in missing:
+                self.cache[i] = {}  # deleted rows still export, with blank names
+        return {i: self.cache[i] for i in ids}
+
+
+class ResultExporter:
+    def __init__(self, db, query, include_archived=False, batch_size=EXPORT_BATCH_SIZE):
+        self.db = db
+        self.query = query
+        self.include_archived = include_archived
+        self.batch_size = batch_size
+        self.users = LookupCache(db.users, ["name", "email"])
+        self.subjects = LookupCache(db.subjects, ["name"])
+        self.models = LookupCache(db.models, ["title"])
+        self.questions = LookupCache(db.questions, ["question_text"])
+
+    async def batches(self):
+        """Joined rows in batches of at most `batch_size`; memory stays flat."""
+        collections = [self.db.assessment_results]
+        if self.include_archived:
+            collections.insert(0, self.db.assessment_results_archive)
+        for collection in collections:
+            cursor = collection.find(self.query, RESULT_PROJECTION).batch_size(self.batch_size)
+            while True:
+                results = await cursor.to_list(self.batch_size)
+                if not results:
+                    break
+                yield await self.join(results)
+
+    async def join(self, results):
+        users, subjects, models, questions = await asyncio.gather(
+            self.users.resolve({r['user_id'] for r in results}),
+            self.subjects.resolve({r['subject_id'] for r in results}),
+            self.models.resolve({r['model_id'] for r in results}),
+            self.questions.resolve({r['question_id'] for r in results}),
+        )
+        return [
+            {
+                "result_id": r['id'],
+                "created_at": r['created_at'],
+                "user_id": r['user_id'],
+                "user_name": users[r['user_id']].get('name'),
+                "user_email": users[r['user_id']].get('email'),
+                "subject_id": r['subject_id'],
+                "subject_name": subjects[r['subject_id']].get('name'),
+                "model_id": r['model_id'],
+                "model_title": models[r['model_id']].get('title'),
+                "question_id": r['question_id'],
+                "question_text": questions[r['question_id']].get('question_text'),
+                "selected_answer": r['selected_answer'],
+                "is_correct": r['is_correct'],
+                "time_spent": r.get('time_spent'),
+            }
+            for r in results
+        ]
+
+    async def csv_chunks(self):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+        writer.writeheader()
+        async for rows in self.batches():
+            writer.writerows(csv_safe(row) for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def parquet_chunks(self):
+        sink = DrainableSink()
+        writer = pq.ParquetWriter(sink, PARQUET_SCHEMA, compression="zstd")
+        try:
+            async for rows in self.batches():
+                # One row group per batch, encoded off the event loop
+                await asyncio.to_thread(writer.write_table, pa.Table.from_pylist(rows, schema=PARQUET_SCHEMA))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+class DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be taken and cleared."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+PARQUET_SCHEMA = pa.schema([
+    ("result_id", pa.string()),
+    ("created_at", pa.string()),
+    ("user_id", pa.string()),
+    ("user_name", pa.string()),
+    ("user_email", pa.string()),
+    ("subject_id", pa.string()),
+    ("subject_name", pa.string()),
+    ("model_id", pa.string()),
+    ("model_title", pa.string()),
+    ("question_id", pa.string()),
+    ("question_text", pa.string()),
+    ("selected_answer", pa.int32()),
+    ("is_correct", pa.bool_()),
+    ("time_spent", pa.int32()),
+]) if pa is not None else None
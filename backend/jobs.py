@@ -0,0 +1,317 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone, timedelta
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JOB_CONCURRENCY = int(os.environ.get('JOB_CONCURRENCY', '2'))
+JOB_PROCESS_WORKERS = int(os.environ.get('JOB_PROCESS_WORKERS', '2'))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '2'))
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', '60'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', '10'))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '30'))
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    """Handed to every job handler: its persisted job document, progress
+    reporting and access to the scheduler's process pool."""
+
+    def __init__(self, scheduler, job):
+        self.scheduler = scheduler
+        self.job = job
+        self.id = job["id"]
+        self._last_progress = 0.0
+
+    async def progress(self, done, total=None, message=None):
+        # At most one write per second, except the final step
+        now = time.monotonic()
+        if now - self._last_progress < 1 and (total is None or done < total):
+            return
+        self._last_progress = now
+        update = {"progress.done": done}
+        if total is not None:
+            update["progress.total"] = total
+        if message is not None:
+            update["progress.message"] = message
+        await self.scheduler.db.jobs.update_one({"id": self.id}, {"$set": update})
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        return await self.scheduler.run_cpu(fn, *args, **kwargs)
+
+
+class JobScheduler:
+    """Persistent background jobs run inside the API process.
+
+    Jobs live in the `jobs` collection, so every worker process runs a
+    scheduler and claims queued jobs atomically. A claimed job holds a lease
+    that its worker renews while it runs; jobs whose lease lapses (worker
+    crashed) are requeued, or failed once out of attempts. Failures are retried
+    with exponential backoff. Periodic jobs are tracked in `job_schedules`, so
+    each period enqueues one job no matter how many workers are running.
+    CPU-bound steps go through `run_cpu`, which uses a process pool.
+    """
+
+    def __init__(self, db, concurrency=JOB_CONCURRENCY, process_workers=JOB_PROCESS_WORKERS,
+                 poll_interval=JOB_POLL_SECONDS, lease_seconds=JOB_LEASE_SECONDS):
+        self.db = db
+        self.concurrency = concurrency
+        self.process_workers = process_workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.handlers = {}  # job type -> (handler, max_attempts, timeout)
+        self.schedules = {}  # job type -> (interval seconds, params)
+        self.running = {}  # job id -> asyncio.Task
+        self.wakeup = asyncio.Event()
+        self._tasks = []
+        self._pool = None
+        self._stopping = False
+
+    def register(self, job_type, handler, max_attempts=JOB_MAX_ATTEMPTS, timeout=None):
+        self.handlers[job_type] = (handler, max_attempts, timeout)
+
+    def every(self, job_type, interval_seconds, **params):
+        self.schedules[job_type] = (interval_seconds, params)
+
+    async def start(self):
+        await self.db.jobs.create_index("id", unique=True)
+        await self.db.jobs.create_index([("status", 1), ("run_at", 1)])
+        await self.db.jobs.create_index([("type", 1), ("status", 1)])
+        await self.db.jobs.create_index([("created_at", -1)])
+        await self.db.jobs.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_DAYS * 86400)
+        await self.db.job_schedules.create_index("type", unique=True)
+        now = utcnow()
+        for job_type, (interval, params) in self.schedules.items():
+            await self.db.job_schedules.update_one(
+                {"type": job_type},
+                {"$set": {"interval_seconds": interval, "params": params}, "$setOnInsert": {"next_run_at": now}},
+                upsert=True,
+            )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        self._stopping = True
+        # Snapshot first: each job's _execute drops itself from `running` as it unwinds
+        interrupted = list(self.running)
+        for task in self._tasks + list(self.running.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if interrupted:
+            # Interrupted by shutdown, not by the job: hand back without using an attempt
+            await self.db.jobs.update_many(
+                {"id": {"$in": interrupted}, "owner": self.worker_id, "status": "running"},
+                {"$set": {"status": "queued", "run_at": utcnow(), "owner": None, "lease_until": None},
+                 "$inc": {"attempts": -1}},
+            )
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def enqueue(self, job_type, created_by=None, delay_seconds=0, **params):
+        if job_type not in self.handlers:
+            raise KeyError(f"Unknown job type {job_type}")
+        now = utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "params": params,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": self.handlers[job_type][1],
+            "progress": {"done": 0, "total": None, "message": None},
+            "result": None,
+            "error": None,
+            "cancel_requested": False,
+            "created_by": created_by,
+            "created_at": now,
+            "run_at": now + timedelta(seconds=delay_seconds),
+            "started_at": None,
+            "finished_at": None,
+            "owner": None,
+            "lease_until": None,
+        }
+        await self.db.jobs.insert_one(job)
+        job.pop("_id", None)
+        self.wakeup.set()
+        return job
+
+    async def get(self, job_id):
+        return await self.db.jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def list(self, status=None, job_type=None, limit=50):
+        query = {}
+        if status:
+            query["status"] = status
+        if job_type:
+            query["type"] = job_type
+        # Listings leave params out; fetch a single job to see them
+        return await self.db.jobs.find(query, {"_id": 0, "params": 0}).sort("created_at", -1).to_list(limit)
+
+    async def cancel(self, job_id):
+        """Queued jobs are cancelled outright. Running jobs are flagged; the
+        owning worker stops them on its next heartbeat, or immediately via
+        `cancel_local` if it is this one or the caller broadcasts the id."""
+        job = await self.db.jobs.find_one_and_update(
+            {"id": job_id, "status": "queued"},
+            {"$set": {"status": "cancelled", "cancel_requested": True, "finished_at": utcnow()}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+        if job is not None:
+            return job
+        job = await self.db.jobs.find_one_and_update(
+            {"id": job_id, "status": "running"},
+            {"$set": {"cancel_requested": True}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+        if job is not None:
+            self.cancel_local(job_id)
+            return job
+        return await self.get(job_id)
+
+    def cancel_local(self, job_id):
+        task = self.running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        call = functools.partial(fn, *args, **kwargs)
+        if self.process_workers <= 0:
+            return await asyncio.to_thread(call)
+        if self._pool is None:
+            # spawn: forking a process that holds Motor's threads and sockets is unsafe
+            self._pool = ProcessPoolExecutor(self.process_workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        except BrokenProcessPool:
+            self._pool = None
+            raise
+
+    async def _claim(self):
+        now = utcnow()
+        return await self.db.jobs.find_one_and_update(
+            {"status": "queued", "run_at": {"$lte": now}, "type": {"$in": list(self.handlers)}},
+            {"$set": {"status": "running", "owner": self.worker_id, "started_at": now,
+                      "lease_until": now + timedelta(seconds=self.lease_seconds)},
+             "$inc": {"attempts": 1}},
+            sort=[("run_at", 1)], projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+
+    async def _worker(self):
+        while True:
+            self.wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.warning("Claiming a job failed", exc_info=True)
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job):
+        handler, _, timeout = self.handlers[job["type"]]
+        ctx = JobContext(self, job)
+        task = asyncio.create_task(asyncio.wait_for(handler(ctx, **job["params"]), timeout))
+        self.running[job["id"]] = task
+        logger.info(f"Job {job['type']} {job['id']} started (attempt {job['attempts']}/{job['max_attempts']})")
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                raise
+            await self._finish(job, "cancelled", error="Cancelled")
+        except Exception as e:
+            logger.exception(f"Job {job['type']} {job['id']} raised on attempt {job['attempts']}")
+            await self._failed(job, e)
+        else:
+            await self._finish(job, "succeeded", result=result)
+        finally:
+            self.running.pop(job["id"], None)
+
+    async def _finish(self, job, status, result=None, error=None):
+        # Owner check: a job whose lease lapsed may already belong to another worker
+        await self.db.jobs.update_one(
+            {"id": job["id"], "owner": self.worker_id, "status": "running"},
+            {"$set": {"status": status, "result": result, "error": error, "finished_at": utcnow(),
+                      "owner": None, "lease_until": None}},
+        )
+        logger.info(f"Job {job['type']} {job['id']} {status}")
+
+    async def _failed(self, job, exc):
+        error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+        if job["attempts"] >= job["max_attempts"]:
+            await self._finish(job, "failed", error=error)
+            return
+        delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+        requeued = await self.db.jobs.update_one(
+            {"id": job["id"], "owner": self.worker_id, "status": "running", "cancel_requested": False},
+            {"$set": {"status": "queued", "error": error, "run_at": utcnow() + timedelta(seconds=delay),
+                      "owner": None, "lease_until": None}},
+        )
+        if not requeued.modified_count:
+            await self._finish(job, "failed", error=error)
+
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 4)
+            try:
+                await self._heartbeat()
+                await self._requeue_expired()
+                await self._enqueue_due_schedules()
+            except Exception:
+                logger.warning("Job maintenance failed", exc_info=True)
+
+    async def _heartbeat(self):
+        if not self.running:
+            return
+        ids = list(self.running)
+        await self.db.jobs.update_many(
+            {"id": {"$in": ids}, "owner": self.worker_id},
+            {"$set": {"lease_until": utcnow() + timedelta(seconds=self.lease_seconds)}},
+        )
+        async for job in self.db.jobs.find({"id": {"$in": ids}, "cancel_requested": True}, {"id": 1}):
+            self.cancel_local(job["id"])
+
+    async def _requeue_expired(self):
+        now = utcnow()
+        expired = {"status": "running", "lease_until": {"$lt": now}}
+        await self.db.jobs.update_many(
+            {**expired, "$expr": {"$lt": ["$attempts", "$max_attempts"]}, "cancel_requested": False},
+            {"$set": {"status": "queued", "run_at": now, "error": "Worker lost", "owner": None, "lease_until": None}},
+        )
+        await self.db.jobs.update_many(
+            expired,
+            {"$set": {"status": "failed", "error": "Worker lost", "finished_at": now, "owner": None, "lease_until": None}},
+        )
+
+    async def _enqueue_due_schedules(self):
+        now = utcnow()
+        for job_type, (interval, params) in self.schedules.items():
+            won = await self.db.job_schedules.find_one_and_update(
+                {"type": job_type, "next_run_at": {"$lte": now}},
+                {"$set": {"next_run_at": now + timedelta(seconds=interval)}},
+            )
+            if won is None:
+                continue
+            if await self.db.jobs.count_documents({"type": job_type, "status": {"$in": ["queued", "running"]}}, limit=1):
+                continue  # previous run still pending; skip this period
+            await self.enqueue(job_type, created_by="schedule", **params)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+LIVE_MIN_INTERVAL_SECONDS = float(os.environ.get('LIVE_MIN_INTERVAL_SECONDS', '1'))
+LEADERBOARD_REFRESH_SECONDS = float(os.environ.get('LEADERBOARD_REFRESH_SECONDS', '2'))
+LIVE_LEADERBOARD_LIMIT = int(os.environ.get('LIVE_LEADERBOARD_LIMIT', '10'))
+LIVE_AUTH_TIMEOUT_SECONDS = float(os.environ.get('LIVE_AUTH_TIMEOUT_SECONDS', '5'))
+
+
+class Watcher:
+    """One live connection. Updates are merged into `pending` and flushed at
+    most once per `min_interval`, so bursts cost one message per connection."""
+
+    def __init__(self, websocket, user_id, min_interval=LIVE_MIN_INTERVAL_SECONDS):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.min_interval = min_interval
+        self.pending = {}
+        self.wakeup = asyncio.Event()
+        self.last_sent = 0.0
+
+    def push_leaderboard(self, message):
+        self.pending["leaderboard"] = message  # latest snapshot wins
+        self.wakeup.set()
+
+    def push_stats_delta(self, subject_id, total, correct):
+        delta = self.pending.setdefault("stats_delta", {"type": "stats_delta", "total": 0, "correct": 0, "subjects": {}})
+        delta["total"] += total
+        delta["correct"] += correct
+        s = delta["subjects"].setdefault(subject_id, {"total": 0, "correct": 0})
+        s["total"] += total
+        s["correct"] += correct
+        self.wakeup.set()
+
+    async def run(self):
+        while True:
+            await self.wakeup.wait()
+            wait = self.last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.wakeup.clear()
+            pending, self.pending = self.pending, {}
+            try:
+                for message in pending.values():
+                    await self.websocket.send_json(message)
+            except Exception:
+                # Socket closed under us; LiveHub.serve sees this task end and cleans up
+                return
+            self.last_sent = time.monotonic()
+
+
+class LiveHub:
+    """Fans submission events out to live watchers.
+
+    Personal stat deltas go only to the submitting user's connections. The
+    leaderboard is recomputed at most once per LEADERBOARD_REFRESH_SECONDS,
+    only while someone is watching, and only broadcast when it changed.
+    """
+
+    def __init__(self, load_leaderboard, refresh_interval=LEADERBOARD_REFRESH_SECONDS):
+        self.load_leaderboard = load_leaderboard
+        self.refresh_interval = refresh_interval
+        self.watchers = {}  # user_id -> set of Watcher
+        self.leaderboard = None
+        self._refresh_task = None
+
+    def __len__(self):
+        return sum(len(w) for w in self.watchers.values())
+
+    async def serve(self, websocket, user_id):
+        watcher = Watcher(websocket, user_id)
+        self.watchers.setdefault(user_id, set()).add(watcher)
+        if self.leaderboard is not None:
+            watcher.push_leaderboard({"type": "leaderboard", "leaderboard": self.leaderboard, "changes": []})
+        sender = asyncio.create_task(watcher.run())
+        receiver = asyncio.create_task(self._receive(websocket))
+        try:
+            # Whichever ends first (client gone, or a send failed) ends the connection
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+            conns = self.watchers.get(user_id)
+            if conns is not None:
+                conns.discard(watcher)
+                if not conns:
+                    del self.watchers[user_id]
+
+    @staticmethod
+    async def _receive(websocket):
+        # Clients don't send anything meaningful; receiving detects disconnects
+        try:
+            while True:
+                await websocket.receive_text()
+        except Exception:
+            pass
+
+    def notify_submission(self, user_id, subject_id, is_correct):
+        for watcher in self.watchers.get(user_id, ()):
+            watcher.push_stats_delta(subject_id, 1, 1 if is_correct else 0)
+        if self.watchers and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_leaderboard())
+
+    async def _refresh_leaderboard(self):
+        # Submissions arriving during this sleep are folded into one recompute
+        await asyncio.sleep(self.refresh_interval)
+        if not self.watchers:
+            return
+        try:
+            leaderboard = await self.load_leaderboard(LIVE_LEADERBOARD_LIMIT)
+        except Exception:
+            logger.exception("Refreshing live leaderboard failed")
+            return
+        if leaderboard == self.leaderboard:
+            return
+        message = {"type": "leaderboard", "leaderboard": leaderboard, "changes": rank_changes(self.leaderboard or [], leaderboard)}
+        self.leaderboard = leaderboard
+        for conns in self.watchers.values():
+            for watcher in conns:
+                watcher.push_leaderboard(message)
+
+
+def rank_changes(old, new):
+    # Keyed by user id: display names need not be unique
+    old_ranks = {entry['user_id']: i + 1 for i, entry in enumerate(old)}
+    changes = []
+    for i, entry in enumerate(new):
+        previous = old_ranks.get(entry['user_id'])
+        if previous != i + 1:
+            changes.append({"user_id": entry['user_id'], "name": entry['name'], "old_rank": previous, "new_rank": i + 1})
+    return changes
@@ -0,0 +1,211 @@
+import hashlib
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def add_vary(headers, value):
+    existing = [v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()]
+    if value.lower() not in existing:
+        headers.add_vary_header(value)
+
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression above `minimum_size` bytes.
+
+    Brotli is preferred when the client accepts it and the package is
+    installed. Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressingResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressingResponder:
+    def __init__(self, send, encoding, config):
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return brotli.Compressor(quality=self.config.brotli_quality)
+        return zlib.compressobj(self.config.gzip_level, zlib.DEFLATED, 31)
+
+    def _compress(self, data, final):
+        if self.encoding == "br":
+            out = self.compressor.process(data) if data else b""
+            return out + self.compressor.finish() if final else out
+        out = self.compressor.compress(data)
+        return out + self.compressor.flush() if final else out
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            headers = MutableHeaders(scope=self.start_message)
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or (not more_body and len(body) < self.config.minimum_size)
+            ):
+                self.passthrough = True
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                return
+
+            self.compressor = self._new_compressor()
+            headers["Content-Encoding"] = self.encoding
+            add_vary(headers, "Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                body = self._compress(body, final=False)
+            else:
+                body = self._compress(body, final=True)
+                headers["Content-Length"] = str(len(body))
+            await self._send(self.start_message)
+            self.start_message = None
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self._compress(body, final=not more_body),
+            "more_body": more_body,
+        })
+
+
+class CacheControlMiddleware:
+    """Adds Cache-Control/Vary to successful GET responses by path prefix.
+
+    `policies` is a list of (path_prefix, cache_control, vary) tuples; the
+    first match wins. Responses that already set Cache-Control are untouched.
+    Responses under a "no-cache" policy are buffered and given an ETag, and a
+    matching If-None-Match gets an empty 304, so revalidating is cheap.
+    """
+
+    def __init__(self, app, policies, default=None):
+        self.app = app
+        self.policies = policies
+        self.default = default
+
+    def policy_for(self, path):
+        for prefix, cache_control, vary in self.policies:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return cache_control, vary
+        return self.default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope["method"] in ("GET", "HEAD")
+        policy = self.policy_for(scope["path"]) if cacheable else ("no-store", None)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+        chunks = []
+
+        async def send_with_policy(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start" and policy is not None:
+                headers = MutableHeaders(scope=message)
+                if "cache-control" not in headers:
+                    cache_control, vary = policy
+                    if 200 <= message["status"] < 300 or "no-store" in cache_control:
+                        headers["Cache-Control"] = cache_control
+                        if vary:
+                            add_vary(headers, vary)
+                        if (scope["method"] == "GET" and message["status"] == 200
+                                and "no-cache" in cache_control and "etag" not in headers):
+                            start_message = message
+                            return
+            elif message["type"] == "http.response.body" and start_message is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await send_with_etag(start_message, b"".join(chunks))
+                return
+            await send(message)
+
+        async def send_with_etag(start, body):
+            headers = MutableHeaders(scope=start)
+            etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+            headers["ETag"] = etag
+            if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+                for name in ("content-length", "content-encoding", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_policy)
@@ -0,0 +1,53 @@
+import time
+
+
+class Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Token buckets keyed by an arbitrary string (client IP, email, ...).
+
+    Buckets that have been idle long enough to refill completely carry no
+    state worth keeping, so they are swept out every `sweep_interval` seconds.
+    """
+
+    def __init__(self, rate_per_minute, burst, max_keys=100_000, sweep_interval=60.0):
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.buckets = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def acquire(self, key, now=None):
+        """Take one token for `key`. Returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_sweep or len(self.buckets) >= self.max_keys:
+            self.sweep(now)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Bucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0
+        return (1 - bucket.tokens) / self.rate
+
+    def sweep(self, now=None):
+        now = time.monotonic() if now is None else now
+        full_after = self.burst / self.rate
+        self.buckets = {k: b for k, b in self.buckets.items() if now - b.updated < full_after}
+        if len(self.buckets) >= self.max_keys:
+            # Still saturated: drop the least recently touched half
+            keep = sorted(self.buckets.items(), key=lambda kv: kv[1].updated)[len(self.buckets) // 2:]
+            self.buckets = dict(keep)
+        self._next_sweep = now + self.sweep_interval
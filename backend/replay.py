@@ -0,0 +1,229 @@
+"""Replay captured production traffic and compare two builds.
+
+Capture is enabled on the server with TRAFFIC_CAPTURE=true (see traffic.py).
+Replay keeps the captured order and inter-arrival timing, scaled by --speed
+("max" sends as fast as --concurrency allows), so two runs of the same capture
+are directly comparable request by request.
+
+Usage:
+    python replay.py run traffic/ --app server:app --out baseline.jsonl
+    python replay.py run traffic/ --url http://staging:8001 --speed 4 \\
+        --login student=student@test.com:pass --token admin=eyJ... --out candidate.jsonl
+    python replay.py compare baseline.jsonl candidate.jsonl --fail-over 10
+
+Requests are replayed against whatever data the target has, so use a copy of
+the production database for meaningful results. Authenticated requests use a
+token for the captured role, from --token or --login; without one they are
+sent anonymously. Non-JSON request bodies are not captured and replay empty.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from traffic import read_capture
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))]
+
+
+def is_error(result):
+    return result["status"] is None or result["status"] >= 500
+
+
+async def login(client, spec):
+    role, _, credentials = spec.partition("=")
+    email, _, password = credentials.partition(":")
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return role, response.json()["token"]
+
+
+async def send(client, index, record, tokens):
+    headers = {}
+    token = tokens.get(record.get("role"))
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    url = record["path"] + (f"?{record['query']}" if record.get("query") else "")
+    result = {"i": index, "method": record["method"], "route": record["route"], "captured_status": record["status"]}
+    start = time.perf_counter()
+    try:
+        response = await client.request(record["method"], url, headers=headers, json=record.get("body"))
+        result.update(status=response.status_code, bytes=len(response.content))
+    except httpx.HTTPError as e:
+        result.update(status=None, bytes=0, error=type(e).__name__)
+    result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+async def replay(client, records, speed, concurrency, tokens):
+    """Open-loop replay: requests start on the captured schedule whether or not
+    earlier ones have finished; `lag_ms` records how late each one started."""
+    results = [None] * len(records)
+    semaphore = asyncio.Semaphore(concurrency)
+    t0 = records[0]["ts"]
+    start = time.monotonic()
+
+    async def fire(i, record, due):
+        async with semaphore:
+            lag = max(0.0, time.monotonic() - due)
+            results[i] = await send(client, i, record, tokens)
+            results[i]["lag_ms"] = round(lag * 1000, 2)
+
+    tasks = []
+    for i, record in enumerate(records):
+        due = start if speed is None else start + (record["ts"] - t0) / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(i, record, due)))
+    await asyncio.gather(*tasks)
+    return results, time.monotonic() - start
+
+
+async def run(args):
+    records = read_capture(args.capture)[:args.limit]
+    if not records:
+        sys.exit("No captured requests found")
+    speed = None if args.speed == "max" else float(args.speed)
+    tokens = dict(t.split("=", 1) for t in args.token)
+
+    if args.app:
+        module, _, attr = args.app.partition(":")
+        app = getattr(importlib.import_module(module), attr or "app")
+        # Unhandled exceptions become 500s, as they would behind a real server
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url, lifespan = "http://replay", app.router.lifespan_context(app)
+    else:
+        transport, base_url, lifespan = None, args.url, None
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            for spec in args.login:
+                role, token = await login(client, spec)
+                tokens[role] = token
+            results, elapsed = await replay(client, records, speed, args.concurrency, tokens)
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    changed = sum(1 for r in results if r["status"] != r["captured_status"])
+    print(f"{len(results)} requests in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s), "
+          f"{changed} with a different status than captured")
+    print_summary(results)
+
+
+def group(results):
+    groups = defaultdict(list)
+    for r in results:
+        groups[f"{r['method']} {r['route']}"].append(r)
+    return groups
+
+
+def stats(results):
+    ms = [r["ms"] for r in results if not is_error(r)]
+    return {
+        "n": len(results),
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "errors": sum(1 for r in results if is_error(r)),
+    }
+
+
+def fmt(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_summary(results):
+    print(f"{'route':<48}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for key, rs in sorted(group(results).items(), key=lambda kv: -len(kv[1])) + [("ALL", results)]:
+        s = stats(rs)
+        print(f"{key:<48}{s['n']:>7}{fmt(s['p50']):>10}{fmt(s['p95']):>10}{fmt(s['p99']):>10}{s['errors']:>8}")
+
+
+def load_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def delta(before, after):
+    if not before or after is None:
+        return "-"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def compare(args):
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    if len(baseline) != len(candidate):
+        print(f"warning: runs differ in length ({len(baseline)} vs {len(candidate)}); "
+              "comparing the common prefix")
+    n = min(len(baseline), len(candidate))
+    baseline, candidate = baseline[:n], candidate[:n]
+
+    print(f"{'route':<48}{'n':>7}{'p50 ms a/b':>16}{'p95 ms a/b':>16}{'Δp95':>7}{'errors':>10}")
+    base_groups, cand_groups = group(baseline), group(candidate)
+    rows = sorted(base_groups, key=lambda k: -len(base_groups[k]))
+    for key, b, c in [(k, base_groups[k], cand_groups.get(k, [])) for k in rows] + [("ALL", baseline, candidate)]:
+        sb, sc = stats(b), stats(c)
+        print(f"{key:<48}{sb['n']:>7}{fmt(sb['p50']):>8}{fmt(sc['p50']):>8}{fmt(sb['p95']):>8}{fmt(sc['p95']):>8}"
+              f"{delta(sb['p95'], sc['p95']):>7}{sb['errors']:>5}{sc['errors']:>5}")
+
+    mismatched = [(b, c) for b, c in zip(baseline, candidate) if b["status"] != c["status"]]
+    print(f"\n{len(mismatched)} request(s) returned a different status")
+    for b, c in mismatched[:20]:
+        print(f"  #{b['i']} {b['method']} {b['route']}: {b['status']} -> {c['status']}")
+
+    if args.fail_over is not None:
+        sb, sc = stats(baseline), stats(candidate)
+        if sc["errors"] > sb["errors"] or (sb["p95"] and sc["p95"] > sb["p95"] * (1 + args.fail_over / 100)):
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="replay a capture and record per-request results")
+    p.add_argument("capture", nargs="+", help="capture files or directories")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--app", help="module:attribute of an ASGI app to drive in-process, e.g. server:app")
+    target.add_argument("--url", help="base URL of a running server")
+    p.add_argument("--speed", default="1", help="time scale (1, 2, 10, ...) or max")
+    p.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight")
+    p.add_argument("--token", action="append", default=[], metavar="ROLE=TOKEN")
+    p.add_argument("--login", action="append", default=[], metavar="ROLE=EMAIL:PASSWORD")
+    p.add_argument("--timeout", type=float, default=30)
+    p.add_argument("--limit", type=int)
+    p.add_argument("--out", help="write per-request results (JSONL) for `compare`")
+
+    c = sub.add_parser("compare", help="latency and error differences between two runs")
+    c.add_argument("baseline")
+    c.add_argument("candidate")
+    c.add_argument("--fail-over", type=float, metavar="PCT",
+                   help="exit 1 if overall p95 grows by more than PCT%% or errors increase")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
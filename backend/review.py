@@ -0,0 +1,132 @@
+import heapq
+import os
+from datetime import datetime, timezone, timedelta
+
+from cachetools import LRUCache
+
+REVIEW_ACTIVE_USERS = int(os.environ.get('REVIEW_ACTIVE_USERS', '10000'))
+RELEARN_MINUTES = int(os.environ.get('REVIEW_RELEARN_MINUTES', '10'))
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+
+def answer_quality(is_correct, time_spent=None):
+    """Map an answer onto the SM-2 0-5 recall quality scale."""
+    if not is_correct:
+        return 1
+    if time_spent is not None and time_spent <= 10:
+        return 5
+    return 4
+
+
+def next_schedule(schedule, quality, now):
+    """SM-2: returns the updated (interval_days, ease, repetitions, lapses, due_at)."""
+    ease = schedule.get('ease', DEFAULT_EASE)
+    repetitions = schedule.get('repetitions', 0)
+    interval = schedule.get('interval_days', 0)
+    lapses = schedule.get('lapses', 0)
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        repetitions = 0
+        interval = 0
+        lapses += 1
+        due_at = now + timedelta(minutes=RELEARN_MINUTES)
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease, 2)
+        repetitions += 1
+        due_at = now + timedelta(days=interval)
+    return interval, round(ease, 3), repetitions, lapses, due_at
+
+
+class ReviewScheduler:
+    """Per-(user, question) spaced-repetition schedules in `review_schedules`.
+
+    Recently active users also get an in-process min-heap of (due_at,
+    question_id). Rescheduling pushes a fresh entry and leaves the old one
+    to be skipped lazily, so both updates and "next N due" are O(log n).
+    Everyone else is served straight from the (user_id, due_at) index.
+    """
+
+    def __init__(self, db, active_users=REVIEW_ACTIVE_USERS):
+        self.db = db
+        self.heaps = LRUCache(maxsize=active_users)  # user_id -> (heap, {question_id: due_at})
+
+    async def record(self, user_id, question, is_correct, time_spent=None, now=None):
+        now = now or datetime.now(timezone.utc)
+        query = {"user_id": user_id, "question_id": question['id']}
+        schedule = await self.db.review_schedules.find_one(query, {"_id": 0}) or {}
+        interval, ease, repetitions, lapses, due_at = next_schedule(
+            schedule, answer_quality(is_correct, time_spent), now
+        )
+        due_at = due_at.isoformat()
+        await self.db.review_schedules.update_one(
+            query,
+            {"$set": {
+                "model_id": question['model_id'],
+                "subject_id": question['subject_id'],
+                "interval_days": interval,
+                "ease": ease,
+                "repetitions": repetitions,
+                "lapses": lapses,
+                "due_at": due_at,
+                "last_reviewed_at": now.isoformat(),
+            }},
+            upsert=True,
+        )
+
+        entry = self.heaps.get(user_id)
+        if entry is None:
+            await self._activate(user_id)
+        else:
+            heap, current = entry
+            current[question['id']] = due_at
+            heapq.heappush(heap, (due_at, question['id']))
+            if len(heap) > 2 * len(current):
+                heap[:] = [(d, qid) for qid, d in current.items()]
+                heapq.heapify(heap)
+
+    def forget(self, user_id=None):
+        """Drop in-process heaps (all of them when user_id is None); they reload on next use."""
+        if user_id is None:
+            self.heaps.clear()
+        else:
+            self.heaps.pop(user_id, None)
+
+    async def _activate(self, user_id):
+        current = {}
+        async for s in self.db.review_schedules.find(
+            {"user_id": user_id}, {"_id": 0, "question_id": 1, "due_at": 1}
+        ):
+            current[s['question_id']] = s['due_at']
+        heap = [(due_at, qid) for qid, due_at in current.items()]
+        heapq.heapify(heap)
+        self.heaps[user_id] = (heap, current)
+
+    async def due(self, user_id, limit=10, now=None):
+        """Up to `limit` (question_id, due_at) pairs due by `now`, earliest first."""
+        now = (now or datetime.now(timezone.utc)).isoformat()
+        entry = self.heaps.get(user_id)
+        if entry is None:
+            docs = await self.db.review_schedules.find(
+                {"user_id": user_id, "due_at": {"$lte": now}}, {"_id": 0, "question_id": 1, "due_at": 1}
+            ).sort("due_at", 1).limit(limit).to_list(limit)
+            return [(d['question_id'], d['due_at']) for d in docs]
+
+        heap, current = entry
+        popped, due, seen = [], [], set()
+        while heap and len(due) < limit and heap[0][0] <= now:
+            due_at, qid = heapq.heappop(heap)
+            if current.get(qid) != due_at or qid in seen:
+                continue  # stale entry from an earlier schedule
+            seen.add(qid)
+            popped.append((due_at, qid))
+            due.append((qid, due_at))
+        for item in popped:
+            heapq.heappush(heap, item)
+        return due
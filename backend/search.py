@@ -0,0 +1,134 @@
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights: a term in a title counts three times, in a label twice
+FIELD_WEIGHTS = {"title": 3, "labels": 2, "body": 1}
+MAX_PREFIX_EXPANSIONS = 64
+# Shorter trailing terms match exactly: a one-letter prefix expands to dozens
+# of common terms and walks most posting lists
+MIN_PREFIX_LENGTH = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """In-process inverted index over the learning catalog with BM25 ranking.
+
+    The vocabulary is kept sorted so the last (possibly partial) query term
+    expands to every indexed term sharing its prefix with two bisections.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc_key: weighted tf}
+        self.vocabulary = []
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.docs = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_type, doc_id, title, labels=(), body="", **payload):
+        key = (doc_type, doc_id)
+        if key in self.docs:
+            self.remove(doc_type, doc_id)
+
+        tf = defaultdict(int)
+        for field, text in (("title", title), ("labels", " ".join(labels)), ("body", body)):
+            for term in tokenize(text):
+                tf[term] += FIELD_WEIGHTS[field]
+
+        for term, count in tf.items():
+            if term not in self.postings:
+                bisect.insort(self.vocabulary, term)
+            self.postings[term][key] = count
+        length = sum(tf.values())
+        self.doc_lengths[key] = length
+        self.doc_terms[key] = list(tf)
+        self.total_length += length
+        self.docs[key] = {"type": doc_type, "id": doc_id, "title": title, **payload}
+
+    def remove(self, doc_type, doc_id):
+        key = (doc_type, doc_id)
+        if key not in self.docs:
+            return
+        for term in self.doc_terms.pop(key):
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+                i = bisect.bisect_left(self.vocabulary, term)
+                if i < len(self.vocabulary) and self.vocabulary[i] == term:
+                    self.vocabulary.pop(i)
+        self.total_length -= self.doc_lengths.pop(key)
+        del self.docs[key]
+
+    def expand_prefix(self, prefix):
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return [prefix] if prefix in self.postings else []
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        return self.vocabulary[start:min(end, start + MAX_PREFIX_EXPANSIONS)]
+
+    def search(self, query, limit=10, types=None):
+        terms = tokenize(query)
+        if not terms or not self.docs:
+            return []
+
+        # Every term but the last must match exactly; the last is a prefix
+        groups = [[t] for t in terms[:-1]]
+        groups.append(self.expand_prefix(terms[-1]))
+
+        n = len(self.docs)
+        avg_length = self.total_length / n
+        scores = defaultdict(float)
+        for group in groups:
+            for term in group:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    if types and key[0] not in types:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[key] / avg_length)
+                    scores[key] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+        return [dict(self.docs[key], score=round(score, 4)) for key, score in best]
+
+    def add_subject(self, subject):
+        self.add("subject", subject['id'], subject['name'], body=subject.get('description', ''),
+                 category=subject.get('category'))
+
+    def add_model(self, model):
+        self.add("model", model['id'], model['title'], labels=model.get('labels', []),
+                 body=model.get('description', ''), subject_id=model['subject_id'])
+
+    def add_question(self, question):
+        self.add("question", question['id'], question['question_text'], body=" ".join(question.get('options', [])),
+                 subject_id=question['subject_id'], model_id=question['model_id'])
+
+    def add_document(self, doc_type, doc):
+        getattr(self, f"add_{doc_type}")(doc)
+
+
+async def build_search_index(db):
+    index = SearchIndex()
+    async for s in db.subjects.find({}, {"_id": 0}):
+        index.add_subject(s)
+    async for m in db.models.find({}, {"_id": 0}):
+        index.add_model(m)
+    async for q in db.questions.find({}, {"_id": 0, "correct_answer": 0}):
+        index.add_question(q)
+    return index
@@ -0,0 +1,359 @@
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+import struct
+import uuid
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+import numpy as np
+import requests
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+ASSET_ROOT = Path(__file__).parent.parent
+THUMBNAIL_DIR = Path(os.environ.get('THUMBNAIL_DIR', ASSET_ROOT / 'models3d' / 'thumbnails'))
+THUMBNAIL_URL_PREFIX = os.environ.get('THUMBNAIL_URL_PREFIX', '/api/thumbnails')
+THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', '256'))
+THUMBNAIL_FORMAT = os.environ.get('THUMBNAIL_FORMAT', 'webp')  # webp or png
+ASSET_TIMEOUT_SECONDS = float(os.environ.get('ASSET_TIMEOUT_SECONDS', '30'))
+ASSET_MAX_BYTES = int(os.environ.get('ASSET_MAX_BYTES', str(64 * 1024 * 1024)))
+
+SUPERSAMPLE = 2
+MAX_TEXTURE_SIZE = 512
+RASTER_CHUNK = 2_000_000  # candidate pixels evaluated per vectorized pass
+
+COMPONENT_DTYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+
+
+class ThumbnailError(Exception):
+    pass
+
+
+# ============ Asset loading ============
+
+def fetch(url, follow_redirects=True):
+    if url.startswith(("http://", "https://")):
+        with requests.get(url, timeout=ASSET_TIMEOUT_SECONDS, stream=True, allow_redirects=follow_redirects) as response:
+            if response.is_redirect:
+                raise ThumbnailError(f"Refusing to follow a redirect from {url}")
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length") or 0) > ASSET_MAX_BYTES:
+                raise ThumbnailError(f"{url} is larger than {ASSET_MAX_BYTES} bytes")
+            chunks, total = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                total += len(chunk)
+                if total > ASSET_MAX_BYTES:
+                    raise ThumbnailError(f"{url} is larger than {ASSET_MAX_BYTES} bytes")
+                chunks.append(chunk)
+            return b"".join(chunks)
+    path = (ASSET_ROOT / url.lstrip("/")).resolve()
+    if ASSET_ROOT.resolve() not in path.parents:
+        raise ThumbnailError(f"Refusing to read {url} outside the asset root")
+    if path.stat().st_size > ASSET_MAX_BYTES:
+        raise ThumbnailError(f"{url} is larger than {ASSET_MAX_BYTES} bytes")
+    return path.read_bytes()
+
+
+def read_uri(uri, base_url):
+    """Bytes of a buffer or image referenced by the model.
+
+    The URI comes from the (possibly third-party) model file, so only data
+    URIs and relative paths inside the model's own directory are allowed;
+    anything else would let the file make the server fetch arbitrary URLs.
+    """
+    if uri.startswith("data:"):
+        return base64.b64decode(uri.split(",", 1)[1])
+    parts = urlsplit(uri)
+    if parts.scheme or parts.netloc or uri.startswith("/") or "\\" in unquote(uri):
+        raise ThumbnailError(f"Refusing to load {uri!r}: only relative URIs are allowed")
+    url = urljoin(base_url, uri)
+    base, target = urlsplit(base_url), urlsplit(url)
+    directory = posixpath.dirname(unquote(base.path)).rstrip("/") + "/"
+    if (target.scheme, target.netloc) != (base.scheme, base.netloc) \
+            or not posixpath.normpath(unquote(target.path)).startswith(directory):
+        raise ThumbnailError(f"Refusing to load {uri!r} outside the model's directory")
+    return fetch(url, follow_redirects=False)
+
+
+class GLTFAsset:
+    """A parsed .glb or .gltf file with its binary buffers resolved."""
+
+    def __init__(self, data, base_url):
+        if data[:4] == b"glTF":
+            self.json, glb_bin = parse_glb(data)
+        else:
+            self.json, glb_bin = json.loads(data), None
+        if self.json.get("extensionsRequired"):
+            raise ThumbnailError(f"Unsupported glTF extensions: {self.json['extensionsRequired']}")
+        self.buffers = []
+        for buffer in self.json.get("buffers", []):
+            if "uri" in buffer:
+                self.buffers.append(read_uri(buffer["uri"], base_url))
+            else:
+                self.buffers.append(glb_bin)
+        self.base_url = base_url
+
+    def buffer_view(self, index):
+        view = self.json["bufferViews"][index]
+        start = view.get("byteOffset", 0)
+        return self.buffers[view["buffer"]][start:start + view["byteLength"]], view.get("byteStride")
+
+    def accessor(self, index):
+        acc = self.json["accessors"][index]
+        dtype = np.dtype(COMPONENT_DTYPES[acc["componentType"]])
+        width = TYPE_SIZES[acc["type"]]
+        count = acc["count"]
+        if "bufferView" not in acc:
+            return np.zeros((count, width), dtype=np.float32)
+        data, stride = self.buffer_view(acc["bufferView"])
+        offset = acc.get("byteOffset", 0)
+        item = dtype.itemsize * width
+        if stride and stride != item:
+            raw = np.frombuffer(data, dtype=np.uint8, count=stride * (count - 1) + item, offset=offset)
+            rows = np.lib.stride_tricks.as_strided(raw, shape=(count, item), strides=(stride, 1))
+            values = np.ascontiguousarray(rows).view(dtype).reshape(count, width)
+        else:
+            values = np.frombuffer(data, dtype=dtype, count=count * width, offset=offset).reshape(count, width)
+        if acc.get("normalized") and dtype.kind in "iu":
+            return values.astype(np.float32) / np.iinfo(dtype).max
+        return values
+
+    def texture(self, index):
+        texture = self.json["textures"][index]
+        image = self.json["images"][texture["source"]]
+        if "bufferView" in image:
+            data, _ = self.buffer_view(image["bufferView"])
+        else:
+            data = read_uri(image["uri"], self.base_url)
+        img = Image.open(io.BytesIO(bytes(data))).convert("RGB")
+        img.thumbnail((MAX_TEXTURE_SIZE, MAX_TEXTURE_SIZE))
+        return np.asarray(img, dtype=np.float32) / 255.0
+
+
+def parse_glb(data):
+    magic, version, length = struct.unpack_from("<4sII", data, 0)
+    if version != 2:
+        raise ThumbnailError(f"Unsupported GLB version {version}")
+    offset, json_chunk, bin_chunk = 12, None, None
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == 0x4E4F534A:  # JSON
+            json_chunk = json.loads(chunk)
+        elif chunk_type == 0x004E4942:  # BIN
+            bin_chunk = chunk
+        offset += 8 + chunk_length
+    if json_chunk is None:
+        raise ThumbnailError("GLB has no JSON chunk")
+    return json_chunk, bin_chunk
+
+
+def node_matrix(node):
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+    t = np.eye(4)
+    t[:3, 3] = node.get("translation", [0, 0, 0])
+    x, y, z, w = node.get("rotation", [0, 0, 0, 1])
+    r = np.eye(4)
+    r[:3, :3] = [
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ]
+    s = np.diag(list(node.get("scale", [1, 1, 1])) + [1])
+    return t @ r @ s
+
+
+def collect_primitives(asset):
+    """World-space triangle primitives: (positions, faces, uvs, texture, base_color)."""
+    gltf = asset.json
+    scene = gltf.get("scenes", [{}])[gltf.get("scene", 0)] if gltf.get("scenes") else {}
+    roots = scene.get("nodes", list(range(len(gltf.get("nodes", [])))))
+    primitives = []
+    texture_cache = {}
+
+    stack = [(i, np.eye(4)) for i in roots]
+    while stack:
+        index, parent = stack.pop()
+        node = gltf["nodes"][index]
+        world = parent @ node_matrix(node)
+        stack.extend((child, world) for child in node.get("children", []))
+        if "mesh" not in node:
+            continue
+        for prim in gltf["meshes"][node["mesh"]]["primitives"]:
+            if prim.get("mode", 4) != 4 or "POSITION" not in prim["attributes"]:
+                continue
+            positions = asset.accessor(prim["attributes"]["POSITION"]).astype(np.float64)
+            positions = positions @ world[:3, :3].T + world[:3, 3]
+            if "indices" in prim:
+                faces = asset.accessor(prim["indices"]).astype(np.int64).reshape(-1, 3)
+            else:
+                faces = np.arange(len(positions) - len(positions) % 3).reshape(-1, 3)
+
+            base_color = np.array([0.8, 0.8, 0.8, 1.0])
+            uvs, texture = None, None
+            if "material" in prim:
+                pbr = gltf["materials"][prim["material"]].get("pbrMetallicRoughness", {})
+                base_color = np.array(pbr.get("baseColorFactor", base_color))
+                tex_info = pbr.get("baseColorTexture")
+                uv_key = f"TEXCOORD_{tex_info.get('texCoord', 0)}" if tex_info else None
+                if tex_info and uv_key in prim["attributes"]:
+                    try:
+                        if tex_info["index"] not in texture_cache:
+                            texture_cache[tex_info["index"]] = asset.texture(tex_info["index"])
+                        texture = texture_cache[tex_info["index"]]
+                        uvs = asset.accessor(prim["attributes"][uv_key]).astype(np.float64)
+                    except Exception:
+                        logger.warning("Could not decode base color texture; using flat color", exc_info=True)
+            primitives.append((positions, faces, uvs, texture, base_color))
+    if not primitives:
+        raise ThumbnailError("Model has no triangle meshes")
+    return primitives
+
+
+# ============ Software rasterizer ============
+
+def view_rotation(yaw_deg=35.0, pitch_deg=20.0):
+    yaw, pitch = np.radians(yaw_deg), np.radians(pitch_deg)
+    ry = np.array([[np.cos(yaw), 0, np.sin(yaw)], [0, 1, 0], [-np.sin(yaw), 0, np.cos(yaw)]])
+    rx = np.array([[1, 0, 0], [0, np.cos(pitch), -np.sin(pitch)], [0, np.sin(pitch), np.cos(pitch)]])
+    return rx @ ry
+
+
+def render(primitives, size=THUMBNAIL_SIZE):
+    """Orthographic z-buffered render of all primitives into an RGBA uint8 array.
+
+    Each pass expands a chunk of triangles into the pixel centres of their
+    bounding boxes, keeps the ones inside (barycentric test) and resolves
+    depth per pixel with a sort, so there is no per-pixel Python loop.
+    """
+    canvas = size * SUPERSAMPLE
+    all_points = np.concatenate([p[0] for p in primitives])
+    lo, hi = all_points.min(axis=0), all_points.max(axis=0)
+    center = (lo + hi) / 2
+    radius = max(np.linalg.norm(all_points - center, axis=1).max(), 1e-9)
+    rotation = view_rotation()
+    light = np.array([0.3, 0.5, 1.0]) / np.linalg.norm([0.3, 0.5, 1.0])
+
+    depth = np.full(canvas * canvas, np.inf)
+    color = np.zeros((canvas * canvas, 3))
+
+    for positions, faces, uvs, texture, base_color in primitives:
+        view = (positions - center) @ rotation.T / radius
+        screen = np.empty_like(view)
+        screen[:, 0] = (view[:, 0] * 0.92 + 1) / 2 * canvas
+        screen[:, 1] = (1 - (view[:, 1] * 0.92 + 1) / 2) * canvas
+        screen[:, 2] = -view[:, 2]
+
+        faces = faces[(faces < len(positions)).all(axis=1)]
+        tri = screen[faces]  # (n, 3, 3)
+        v = view[faces]
+        normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+        lengths = np.linalg.norm(normals, axis=1)
+        area = ((tri[:, 1, 0] - tri[:, 0, 0]) * (tri[:, 2, 1] - tri[:, 0, 1])
+                - (tri[:, 1, 1] - tri[:, 0, 1]) * (tri[:, 2, 0] - tri[:, 0, 0]))
+        keep = (np.abs(area) > 1e-12) & (lengths > 0)
+        faces, tri, normals, lengths, area = faces[keep], tri[keep], normals[keep], lengths[keep], area[keep]
+        shade = 0.3 + 0.7 * np.abs((normals / lengths[:, None]) @ light)
+
+        x0 = np.clip(np.floor(tri[:, :, 0].min(axis=1)), 0, canvas - 1).astype(np.int64)
+        x1 = np.clip(np.ceil(tri[:, :, 0].max(axis=1)), 0, canvas - 1).astype(np.int64)
+        y0 = np.clip(np.floor(tri[:, :, 1].min(axis=1)), 0, canvas - 1).astype(np.int64)
+        y1 = np.clip(np.ceil(tri[:, :, 1].max(axis=1)), 0, canvas - 1).astype(np.int64)
+        widths, heights = x1 - x0 + 1, y1 - y0 + 1
+        counts = widths * heights
+
+        start = 0
+        while start < len(faces):
+            end = start + max(1, int(np.searchsorted(np.cumsum(counts[start:]), RASTER_CHUNK)))
+            sel = np.arange(start, min(end, len(faces)))
+            start = sel[-1] + 1
+
+            t = np.repeat(sel, counts[sel])
+            local = np.arange(len(t)) - np.repeat(np.cumsum(counts[sel]) - counts[sel], counts[sel])
+            px = x0[t] + local % widths[t]
+            py = y0[t] + local // widths[t]
+            cx, cy = px + 0.5, py + 0.5
+
+            a, b, c = tri[t, 0], tri[t, 1], tri[t, 2]
+            l0 = ((b[:, 0] - cx) * (c[:, 1] - cy) - (b[:, 1] - cy) * (c[:, 0] - cx)) / area[t]
+            l1 = ((c[:, 0] - cx) * (a[:, 1] - cy) - (c[:, 1] - cy) * (a[:, 0] - cx)) / area[t]
+            l2 = 1 - l0 - l1
+            inside = (l0 >= 0) & (l1 >= 0) & (l2 >= 0)
+            if not inside.any():
+                continue
+            t, px, py, l0, l1, l2 = t[inside], px[inside], py[inside], l0[inside], l1[inside], l2[inside]
+            z = l0 * tri[t, 0, 2] + l1 * tri[t, 1, 2] + l2 * tri[t, 2, 2]
+            pixel = py * canvas + px
+
+            # Nearest candidate per pixel within this chunk, then against the z-buffer
+            order = np.lexsort((z, pixel))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pixel[order][1:] != pixel[order][:-1]
+            best = order[first]
+            closer = z[best] < depth[pixel[best]]
+            best = best[closer]
+            if not len(best):
+                continue
+
+            rgb = np.tile(base_color[:3], (len(best), 1))
+            if texture is not None:
+                fi = faces[t[best]]
+                uv = (l0[best, None] * uvs[fi[:, 0]] + l1[best, None] * uvs[fi[:, 1]]
+                      + l2[best, None] * uvs[fi[:, 2]])
+                th, tw = texture.shape[:2]
+                u = (np.mod(uv[:, 0], 1.0) * (tw - 1)).astype(np.int64)
+                vv = (np.mod(uv[:, 1], 1.0) * (th - 1)).astype(np.int64)
+                rgb = rgb * texture[vv, u]
+            depth[pixel[best]] = z[best]
+            color[pixel[best]] = rgb * shade[t[best], None]
+
+    covered = np.isfinite(depth).reshape(canvas, canvas, 1).astype(np.float64)
+    rgba = np.concatenate([color.reshape(canvas, canvas, 3), covered], axis=2)
+    # Box-filter the supersampled canvas down to the output size
+    rgba = rgba.reshape(size, SUPERSAMPLE, size, SUPERSAMPLE, 4).mean(axis=(1, 3))
+    alpha = rgba[:, :, 3:4]
+    rgb = np.divide(rgba[:, :, :3], alpha, out=np.zeros_like(rgba[:, :, :3]), where=alpha > 0)
+    out = np.concatenate([rgb, alpha], axis=2)
+    return (np.clip(out, 0, 1) * 255).astype(np.uint8)
+
+
+# ============ Thumbnail pipeline ============
+
+def encode_image(rgba, fmt=THUMBNAIL_FORMAT):
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        Image.fromarray(rgba, "RGBA").save(buffer, format="WEBP", quality=80, method=6)
+    else:
+        Image.fromarray(rgba, "RGBA").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def render_thumbnail(model_url, size=THUMBNAIL_SIZE, fmt=THUMBNAIL_FORMAT):
+    """Fetch, parse and render a glTF/GLB model; returns the stored file name.
+
+    Files are named by the SHA-256 of their bytes, so identical renders are
+    stored once and URLs can be cached forever.
+    """
+    asset = GLTFAsset(fetch(model_url), model_url)
+    data = encode_image(render(collect_primitives(asset), size), fmt)
+    name = f"{hashlib.sha256(data).hexdigest()[:32]}.{fmt}"
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    path = THUMBNAIL_DIR / name
+    if not path.exists():
+        # Unique per writer: pool workers may render the same bytes at once
+        tmp = THUMBNAIL_DIR / f".{name}.{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    return name
+
+
+def thumbnail_url(name):
+    return f"{THUMBNAIL_URL_PREFIX}/{name}"
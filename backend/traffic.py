@@ -0,0 +1,215 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+import jwt
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+TRAFFIC_CAPTURE = os.environ.get('TRAFFIC_CAPTURE', 'false').lower() == 'true'
+TRAFFIC_CAPTURE_DIR = Path(os.environ.get('TRAFFIC_CAPTURE_DIR', Path(__file__).parent / 'traffic'))
+TRAFFIC_SAMPLE_RATE = float(os.environ.get('TRAFFIC_SAMPLE_RATE', '0.1'))
+TRAFFIC_MAX_BODY_BYTES = int(os.environ.get('TRAFFIC_MAX_BODY_BYTES', '65536'))
+TRAFFIC_FLUSH_RECORDS = int(os.environ.get('TRAFFIC_FLUSH_RECORDS', '500'))
+TRAFFIC_EXCLUDE_PATHS = tuple(p for p in os.environ.get('TRAFFIC_EXCLUDE_PATHS', '/healthz,/readyz').split(',') if p)
+
+# Secrets are replaced by a fixed value so captured register/login pairs still
+# match each other on replay; emails become stable pseudonyms for the same reason.
+SECRET_KEYS = {"password", "token", "access_token", "refresh_token", "secret", "api_key", "authorization"}
+# Free-text personal data, matched by key: string values become pseudonyms
+TRAFFIC_PERSONAL_KEYS = {
+    k.strip().lower()
+    for k in os.environ.get('TRAFFIC_PERSONAL_KEYS', 'name,full_name,first_name,last_name,phone,address').split(',')
+    if k.strip()
+}
+REPLAY_PASSWORD = "replay-password"
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def pseudonym(value):
+    return hashlib.sha256(value.encode()).hexdigest()[:12]
+
+
+def pseudonymize_email(email):
+    return f"user-{pseudonym(email.lower())}@replay.invalid"
+
+
+def redact_field(key, value):
+    key = key.lower()
+    if key in SECRET_KEYS:
+        return REPLAY_PASSWORD
+    if key in TRAFFIC_PERSONAL_KEYS and isinstance(value, str):
+        return f"{key}-{pseudonym(value)}"
+    return redact(value)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {k: redact_field(k, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    if isinstance(value, str) and EMAIL_RE.match(value):
+        return pseudonymize_email(value)
+    return value
+
+
+def redact_query(query_string):
+    if not query_string:
+        return ""
+    pairs = parse_qsl(query_string, keep_blank_values=True)
+    return urlencode([(k, redact_field(k, v)) for k, v in pairs])
+
+
+def token_role(authorization):
+    """Role claim of a bearer token, read without verifying it. Only the role is
+    recorded; replay substitutes a token for that role."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("role", "user")
+    except jwt.PyJWTError:
+        return "invalid"
+
+
+class TrafficRecorder:
+    """Buffers capture records and appends them to a per-worker gzip JSONL
+    file. Each flush writes one gzip member; readers see one stream."""
+
+    def __init__(self, directory=TRAFFIC_CAPTURE_DIR, flush_records=TRAFFIC_FLUSH_RECORDS):
+        self.directory = Path(directory)
+        self.path = self.directory / f"capture-{socket.gethostname()}-{os.getpid()}.jsonl.gz"
+        self.flush_records = flush_records
+        self.buffer = []
+        self._lock = asyncio.Lock()
+
+    def record(self, entry):
+        self.buffer.append(entry)
+        if len(self.buffer) >= self.flush_records and not self._lock.locked():
+            asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            if not self.buffer:
+                return
+            batch, self.buffer = self.buffer, []
+            data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in batch).encode()
+            try:
+                await asyncio.to_thread(self._append, gzip.compress(data))
+            except OSError:
+                logger.exception(f"Writing {len(batch)} traffic records failed")
+
+    def _append(self, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+class TrafficCaptureMiddleware:
+    """Samples HTTP requests into a TrafficRecorder for later replay.
+
+    Records route template and concrete path, redacted query and JSON body,
+    caller role, status, response size, time to last byte and the gap since
+    the previous request this worker saw (sampled or not). Non-JSON bodies
+    and bodies over `max_body_bytes` are recorded by size only.
+    """
+
+    def __init__(self, app, recorder, sample_rate=TRAFFIC_SAMPLE_RATE,
+                 max_body_bytes=TRAFFIC_MAX_BODY_BYTES, exclude_paths=TRAFFIC_EXCLUDE_PATHS):
+        self.app = app
+        self.recorder = recorder
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.exclude_paths = exclude_paths
+        self.last_arrival = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic()
+        gap = None if self.last_arrival is None else now - self.last_arrival
+        self.last_arrival = now
+        path = scope["path"]
+        if random.random() >= self.sample_rate or path.startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        ts = time.time()
+        body = bytearray()
+        body_bytes = 0
+        status = None
+        response_bytes = 0
+
+        async def capture_receive():
+            nonlocal body_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_bytes += len(chunk)
+                if len(body) + len(chunk) <= self.max_body_bytes:
+                    body.extend(chunk)
+            return message
+
+        async def capture_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self.recorder.record(self._entry(scope, ts, gap, body, body_bytes, status, response_bytes,
+                                             (time.monotonic() - now) * 1000))
+
+    def _entry(self, scope, ts, gap, body, body_bytes, status, response_bytes, duration_ms):
+        headers = Headers(scope=scope)
+        route = scope.get("route")
+        content_type = headers.get("content-type", "")
+        entry = {
+            "ts": round(ts, 4),
+            "gap": None if gap is None else round(gap, 4),
+            "method": scope["method"],
+            "route": getattr(route, "path", scope["path"]),
+            "path": scope["path"],
+            "query": redact_query(scope.get("query_string", b"").decode("latin-1")),
+            "role": token_role(headers.get("authorization", "")),
+            "body_bytes": body_bytes,
+            "status": status or 500,
+            "ms": round(duration_ms, 2),
+            "response_bytes": response_bytes,
+        }
+        if body_bytes and body_bytes == len(body) and content_type.startswith("application/json"):
+            try:
+                entry["body"] = redact(json.loads(body))
+            except ValueError:
+                pass
+        return entry
+
+
+def read_capture(paths):
+    """All records from one or more capture files (or directories of them),
+    merged across workers in arrival order."""
+    files = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.glob("capture-*.jsonl.gz")) if p.is_dir() else [p])
+    records = []
+    for f in files:
+        with gzip.open(f, "rt") as fh:
+            records.extend(json.loads(line) for line in fh if line.strip())
+    records.sort(key=lambda r: r["ts"])
+    return records
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timezone
+
+import requests
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_PROVIDER = os.environ.get('TRANSLATION_PROVIDER', 'mymemory')  # mymemory or local
+TRANSLATION_LANGUAGES = [l for l in os.environ.get('TRANSLATION_LANGUAGES', 'ta').split(',') if l]
+TRANSLATION_TIMEOUT_SECONDS = float(os.environ.get('TRANSLATION_TIMEOUT_SECONDS', '5'))
+
+
+class MyMemoryProvider:
+    """The public MyMemory API the frontend used to call directly."""
+    name = "mymemory"
+    url = "https://api.mymemory.translated.net/get"
+
+    def _translate(self, text, source, target):
+        response = requests.get(
+            self.url,
+            params={"q": text, "langpair": f"{source}|{target}"},
+            timeout=TRANSLATION_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        data = response.json()
+        # Quota, bad-language and too-long errors come back as HTTP 200 with the
+        # message in translatedText; only responseStatus tells them apart
+        status = data.get("responseStatus")
+        if str(status) != "200":
+            raise RuntimeError(f"MyMemory returned {status}: {data.get('responseDetails') or data['responseData']['translatedText']}")
+        return data["responseData"]["translatedText"]
+
+    async def translate(self, text, source, target):
+        return await asyncio.to_thread(self._translate, text, source, target)
+
+
+class LocalProvider:
+    """Deterministic stand-in for tests and offline development."""
+    name = "local"
+
+    async def translate(self, text, source, target):
+        return f"[{target}] {text}"
+
+
+PROVIDERS = {p.name: p for p in (MyMemoryProvider, LocalProvider)}
+
+
+def create_provider(name=None):
+    return PROVIDERS[name or TRANSLATION_PROVIDER]()
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class TranslationService:
+    """Translations of model descriptions keyed by (model_id, lang, description hash).
+
+    Lookups go memory -> `translations` collection -> provider; provider
+    results are written back so each description is translated once.
+    """
+
+    def __init__(self, db, provider, source_lang='en', cache_size=4096):
+        self.db = db
+        self.provider = provider
+        self.source_lang = source_lang
+        self.cache = LRUCache(maxsize=cache_size)
+        self.in_flight = {}
+
+    async def get(self, model_id, text, lang):
+        key = (model_id, lang, text_hash(text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        doc = await self.db.translations.find_one(
+            {"model_id": model_id, "lang": lang, "source_hash": key[2]}, {"_id": 0, "text": 1}
+        )
+        if doc:
+            self.cache[key] = doc['text']
+            return doc['text']
+        return None
+
+    async def ensure(self, model_id, text, lang):
+        if lang == self.source_lang:
+            return text
+        if lang not in TRANSLATION_LANGUAGES:
+            raise ValueError(f"Unsupported language {lang}")
+        cached = await self.get(model_id, text, lang)
+        if cached is not None:
+            return cached
+
+        key = (model_id, lang, text_hash(text))
+        # Concurrent viewers of a new model share one provider call
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._translate_and_store(key, text))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _translate_and_store(self, key, text):
+        model_id, lang, source_hash = key
+        translated = await self.provider.translate(text, self.source_lang, lang)
+        await self.db.translations.update_one(
+            {"model_id": model_id, "lang": lang, "source_hash": source_hash},
+            {"$set": {
+                "text": translated,
+                "provider": self.provider.name,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }},
+            upsert=True,
+        )
+        self.cache[key] = translated
+        return translated
+
+    async def precompute(self, model_id, text, languages=None):
+        for lang in languages or TRANSLATION_LANGUAGES:
+            try:
+                await self.ensure(model_id, text, lang)
+            except Exception:
+                logger.exception(f"Precomputing {lang} translation for model {model_id} failed")
@@ -11,7 +11,7 @@ import Assessment from '@/pages/Assessment';
 import Performance from '@/pages/Performance';
 import { Toaster } from '@/components/ui/sonner';
 
-const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+export const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export const API = `${BACKEND_URL}/api`;
 
 export const AuthContext = React.createContext();
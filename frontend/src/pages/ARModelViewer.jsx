@@ -57,15 +57,13 @@ export default function ARModelViewer() {
     }
   };
 
-  // 🌐 AI Translation (Frontend only)
-  const translateToTamil = async (text) => {
+  // 🌐 Translation (cached server-side per model description)
+  const translateToTamil = async () => {
     try {
-      const url = `https://api.mymemory.translated.net/get?q=${encodeURIComponent(
-        text
-      )}&langpair=en|ta`;
-      const response = await fetch(url);
-      const data = await response.json();
-      return data.responseData.translatedText;
+      const res = await axios.get(`${API}/models/${modelId}?lang=ta`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      return res.data.translated_description || '';
     } catch {
       return '';
     }
@@ -101,7 +99,7 @@ export default function ARModelViewer() {
   } else {
     // Tamil voice exists → use Tamil text + voice
     if (!tamilText) {
-      const translated = await translateToTamil(model.description);
+      const translated = await translateToTamil();
       if (translated) {
         setTamilText(translated);
         textToSpeak = translated;
@@ -52,12 +52,32 @@ export default function AdminDashboard() {
     toast.success('Logged out successfully');
   };
 
+  const waitForJob = async (jobId) => {
+    // Heavy admin work runs as a background job; poll until it finishes
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const res = await axios.get(`${API}/admin/jobs/${jobId}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      if (['succeeded', 'failed', 'cancelled'].includes(res.data.status)) {
+        return res.data;
+      }
+    }
+  };
+
   const handleInitializeData = async () => {
     setLoading(true);
     try {
-      await axios.post(`${API}/admin/initialize-data`, {}, {
+      const res = await axios.post(`${API}/admin/initialize-data`, {}, {
         headers: { Authorization: `Bearer ${token}` }
       });
+      if (res.data.job_id) {
+        const job = await waitForJob(res.data.job_id);
+        if (job.status !== 'succeeded') {
+          toast.error(job.error || 'Failed to initialize data');
+          return;
+        }
+      }
       toast.success('Sample data initialized!');
       fetchData();
     } catch (err) {
@@ -29,12 +29,11 @@ export default function Assessment() {
 
   const fetchModelAndQuestions = async () => {
     try {
-      const [modelRes, questionsRes] = await Promise.all([
-        axios.get(`${API}/models/${modelId}`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/questions/${modelId}?difficulty=${difficulty}`, { headers: { Authorization: `Bearer ${token}` } })
-      ]);
-      setModel(modelRes.data);
-      setQuestions(questionsRes.data);
+      const res = await axios.get(`${API}/bootstrap/assessment/${modelId}?difficulty=${difficulty}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setModel(res.data.model);
+      setQuestions(res.data.questions);
       setLoading(false);
     } catch (err) {
       toast.error('Failed to load assessment');
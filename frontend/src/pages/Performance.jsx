@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
-import { API, AuthContext } from '@/App';
+import { API, BACKEND_URL, AuthContext } from '@/App';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Progress } from '@/components/ui/progress';
@@ -22,14 +22,51 @@ export default function Performance() {
     fetchData();
   }, []);
 
+  // Live leaderboard and stat updates pushed by the backend instead of polling
+  useEffect(() => {
+    const socket = new WebSocket(`${BACKEND_URL.replace(/^http/, 'ws')}/api/ws/live`);
+    // The token goes in the first message rather than the URL, which ends up in logs
+    socket.onopen = () => socket.send(JSON.stringify({ type: 'auth', token }));
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'leaderboard') {
+        setLeaderboard(message.leaderboard);
+      } else if (message.type === 'stats_delta') {
+        setStats(prev => prev && applyStatsDelta(prev, message));
+      }
+    };
+    return () => socket.close();
+  }, [token]);
+
+  const applyStatsDelta = (prev, delta) => {
+    const total = prev.total_assessments + delta.total;
+    const correct = prev.correct_answers + delta.correct;
+    const subjectPerf = { ...prev.subject_wise_performance };
+    Object.entries(delta.subjects).forEach(([subjectId, d]) => {
+      const name = Object.keys(subjectPerf).find(n => subjectPerf[n].subject_id === subjectId);
+      if (!name) return;
+      const s = subjectPerf[name];
+      const sTotal = s.total + d.total;
+      const sCorrect = s.correct + d.correct;
+      subjectPerf[name] = { ...s, total: sTotal, correct: sCorrect, accuracy: sCorrect / sTotal };
+    });
+    return {
+      ...prev,
+      total_assessments: total,
+      correct_answers: correct,
+      accuracy: total ? correct / total : 0,
+      subject_wise_performance: subjectPerf,
+      weak_topics: Object.keys(subjectPerf).filter(n => subjectPerf[n].accuracy < 0.6)
+    };
+  };
+
   const fetchData = async () => {
     try {
-      const [perfRes, leaderRes] = await Promise.all([
-        axios.get(`${API}/performance`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/leaderboard`, { headers: { Authorization: `Bearer ${token}` } })
-      ]);
-      setStats(perfRes.data);
-      setLeaderboard(leaderRes.data);
+      const res = await axios.get(`${API}/bootstrap/performance`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setStats(res.data.performance);
+      setLeaderboard(res.data.leaderboard);
     } catch (err) {
       toast.error('Failed to load performance data');
     } finally {
@@ -200,7 +237,7 @@ export default function Performance() {
                 <div className="space-y-3">
                   {leaderboard.map((entry, idx) => (
                     <div
-                      key={idx}
+                      key={entry.user_id}
                       className="flex items-center justify-between p-3 bg-gradient-to-r from-indigo-50 to-purple-50 rounded-lg"
                       data-testid={`leaderboard-item-${idx}`}
                     >
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
-import { API, AuthContext } from '@/App';
+import { API, BACKEND_URL, AuthContext } from '@/App';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
@@ -13,6 +13,7 @@ export default function SubjectSelection() {
   const { token } = React.useContext(AuthContext);
   const [subjects, setSubjects] = useState([]);
   const [models, setModels] = useState([]);
+  const [modelsBySubject, setModelsBySubject] = useState({});
   const [selectedSubject, setSelectedSubject] = useState(null);
   const [search, setSearch] = useState('');
   const [loading, setLoading] = useState(true);
@@ -23,10 +24,11 @@ export default function SubjectSelection() {
 
   const fetchSubjects = async () => {
     try {
-      const res = await axios.get(`${API}/subjects`, {
+      const res = await axios.get(`${API}/bootstrap/subjects`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setSubjects(res.data);
+      setSubjects(res.data.subjects);
+      setModelsBySubject(res.data.models_by_subject);
     } catch (err) {
       toast.error('Failed to load subjects');
     } finally {
@@ -34,20 +36,9 @@ export default function SubjectSelection() {
     }
   };
 
-  const fetchModels = async (subjectId) => {
-    try {
-      const res = await axios.get(`${API}/models?subject_id=${subjectId}`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setModels(res.data);
-    } catch (err) {
-      toast.error('Failed to load models');
-    }
-  };
-
   const handleSelectSubject = (subject) => {
     setSelectedSubject(subject);
-    fetchModels(subject.id);
+    setModels(modelsBySubject[subject.id] || []);
   };
 
   const filteredSubjects = subjects.filter(s => 
@@ -134,7 +125,16 @@ export default function SubjectSelection() {
                 >
                   <CardHeader>
                     <div className="w-full h-48 bg-gradient-to-br from-blue-100 to-indigo-100 rounded-xl flex items-center justify-center mb-4">
-                      <Eye className="w-16 h-16 text-indigo-400" />
+                      {model.thumbnail_url ? (
+                        <img
+                          src={`${BACKEND_URL}${model.thumbnail_url}`}
+                          alt={model.title}
+                          loading="lazy"
+                          className="h-full object-contain"
+                        />
+                      ) : (
+                        <Eye className="w-16 h-16 text-indigo-400" />
+                      )}
                     </div>
                     <CardTitle>{model.title}</CardTitle>
                     <CardDescription>{model.description}</CardDescription>
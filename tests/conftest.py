@@ -0,0 +1,222 @@
+"""Shared test setup: backend modules on the import path and an in-memory
+stand-in for the Motor collections the unit tests touch.
+
+The fake covers only what those tests use: equality and $in/$lt/$lte/$gt/
+$gte/$ne filters, $set/$inc/$setOnInsert updates (dotted paths allowed),
+sort/limit cursors and $match/$group/$sum aggregations. Projections are
+ignored. Anything that depends on real server behaviour belongs in the
+tests gated on MONGO_TEST_URL.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+
+def resolve(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def compare(op, value, operand):
+    if op == "$in":
+        return value in operand
+    if op == "$ne":
+        return value != operand
+    # BSON order puts null below every number and string
+    if value is None or operand is None:
+        return False
+    return {"$lt": value < operand, "$lte": value <= operand,
+            "$gt": value > operand, "$gte": value >= operand}[op]
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        value = resolve(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(compare(op, value, operand) for op, operand in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def set_path(doc, path, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def apply_update(doc, update, inserted=False):
+    for path, value in update.get("$set", {}).items():
+        set_path(doc, path, value)
+    for path, n in update.get("$inc", {}).items():
+        set_path(doc, path, (resolve(doc, path) or 0) + n)
+    if inserted:
+        for path, value in update.get("$setOnInsert", {}).items():
+            set_path(doc, path, value)
+
+
+def evaluate(expr, doc):
+    """Aggregation expressions, evaluated the way mongod does."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return resolve(doc, expr[1:])
+    if isinstance(expr, dict):
+        (op, args), = expr.items()
+        if op == "$cond":
+            condition, then, otherwise = args
+            return evaluate(then if evaluate(condition, doc) else otherwise, doc)
+        if op in ("$gt", "$gte", "$lt", "$lte", "$ne"):
+            left, right = (evaluate(a, doc) for a in args)
+            return compare(op, left, right)
+        raise NotImplementedError(op)
+    return expr
+
+
+def group(docs, spec):
+    groups = {}
+    for d in docs:
+        key = evaluate(spec["_id"], d)
+        acc = groups.setdefault(key, {"_id": key, **{f: 0 for f in spec if f != "_id"}})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            value = evaluate(accumulator["$sum"], d)
+            # $sum skips non-numeric values
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                acc[field] += value
+    return list(groups.values())
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = [dict(d) for d in docs]
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for k, d in reversed(keys):
+            self.docs.sort(key=lambda doc: resolve(doc, k), reverse=d < 0)
+        return self
+
+    def limit(self, n):
+        if n:
+            self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, n=None):
+        # Consumes like a Motor cursor, so repeated calls page through
+        docs, self.docs = (self.docs, []) if n is None else (self.docs[:n], self.docs[n:])
+        return docs
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        while self.docs:
+            yield self.docs.pop(0)
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+
+    def _first(self, query, sort=None):
+        candidates = [d for d in self.docs if matches(d, query)]
+        for k, direction in reversed(sort or []):
+            candidates.sort(key=lambda doc: resolve(doc, k), reverse=direction < 0)
+        return candidates[0] if candidates else None
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(d for d in self.docs if matches(d, query or {}))
+
+    async def find_one(self, query=None, projection=None):
+        doc = self._first(query or {})
+        return None if doc is None else dict(doc)
+
+    async def count_documents(self, query, limit=0):
+        n = sum(1 for d in self.docs if matches(d, query))
+        return min(n, limit) if limit else n
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def insert_many(self, docs):
+        self.docs.extend(dict(d) for d in docs)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self._first(query)
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            apply_update(doc, update, inserted=True)
+            self.docs.append(doc)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=len(self.docs))
+        apply_update(doc, update)
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    async def update_many(self, query, update):
+        docs = [d for d in self.docs if matches(d, query)]
+        for doc in docs:
+            apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(docs), modified_count=len(docs))
+
+    async def find_one_and_update(self, query, update, sort=None, projection=None, return_document=False):
+        doc = self._first(query, sort)
+        if doc is None:
+            return None
+        before = dict(doc)
+        apply_update(doc, update)
+        # ReturnDocument.AFTER is True
+        return dict(doc) if return_document else before
+
+    async def delete_many(self, query):
+        kept = [d for d in self.docs if not matches(d, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return SimpleNamespace(deleted_count=deleted)
+
+    def aggregate(self, pipeline):
+        docs = self.docs
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if matches(d, spec)]
+            elif op == "$group":
+                docs = group(docs, spec)
+            else:
+                raise NotImplementedError(op)
+        return FakeCursor(docs)
+
+
+class FakeDb:
+    """Collections spring into existence on first access, like Motor's."""
+
+    def __init__(self, **collections):
+        self.collections = {name: FakeCollection(docs) for name, docs in collections.items()}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db():
+    """Factory: `fake_db(users=[...], questions=[...])`."""
+    return FakeDb
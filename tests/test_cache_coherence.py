@@ -0,0 +1,210 @@
+"""Cross-worker cache invalidation (backend/cachebus.py).
+
+The local-bus tests start real worker processes sharing one bus directory.
+The Mongo change-stream test needs a replica set (a single-node one is fine):
+
+    MONGO_TEST_URL=mongodb://localhost:27017/?replicaSet=rs0 pytest tests/test_cache_coherence.py
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+import cachebus  # noqa: E402
+from cachebus import CoherentCache, InvalidationBus, LocalBroadcastBus  # noqa: E402
+
+WORKERS = 3
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+
+def run_worker(kind, target, ready, received, expected):
+    """Worker process: subscribe to "catalog" and report what arrives."""
+    async def main():
+        if kind == "local":
+            bus = LocalBroadcastBus(directory=target)
+        else:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = AsyncIOMotorClient(MONGO_TEST_URL)
+            bus = cachebus.MongoChangeStreamBus(client[target])
+        done = asyncio.Event()
+        seen = []
+
+        def on_catalog(payload):
+            seen.append(payload)
+            if len(seen) >= expected:
+                done.set()
+
+        bus.subscribe("catalog", on_catalog)
+        await bus.start()
+        while not bus.healthy:
+            await asyncio.sleep(0.05)
+        ready.put(bus.worker_id)
+        try:
+            await asyncio.wait_for(done.wait(), timeout=20)
+        finally:
+            received.put((bus.worker_id, seen))
+            await bus.stop()
+
+    asyncio.run(main())
+
+
+def start_workers(kind, target, expected):
+    ctx = multiprocessing.get_context("spawn")
+    ready, received = ctx.Queue(), ctx.Queue()
+    procs = [ctx.Process(target=run_worker, args=(kind, target, ready, received, expected)) for _ in range(WORKERS)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get(timeout=30)
+    return procs, received
+
+
+def collect(procs, received):
+    results = dict(received.get(timeout=30) for _ in procs)
+    for p in procs:
+        p.join(timeout=10)
+    return results
+
+
+def test_local_bus_reaches_every_worker(tmp_path):
+    procs, received = start_workers("local", str(tmp_path), expected=2)
+
+    async def publish():
+        bus = LocalBroadcastBus(directory=tmp_path)
+        await bus.start()
+        await bus.publish("catalog", key="subjects")
+        await bus.publish("catalog", key="models")
+        await bus.stop()
+
+    asyncio.run(publish())
+    results = collect(procs, received)
+
+    assert len(results) == WORKERS
+    for seen in results.values():
+        assert seen == [{"key": "subjects"}, {"key": "models"}]
+
+
+def test_local_bus_removes_dead_worker_sockets(tmp_path):
+    stale = tmp_path / "gone.sock"
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    s.bind(str(stale))
+    s.close()  # bound file left behind with no reader, like a crashed worker
+
+    async def publish():
+        bus = LocalBroadcastBus(directory=tmp_path)
+        await bus.start()
+        await bus.publish("catalog")
+        await bus.stop()
+
+    asyncio.run(publish())
+    assert not stale.exists()
+
+
+def test_sequence_gap_flushes_caches():
+    bus = InvalidationBus(worker_id="me")
+    calls = []
+    bus.subscribe("catalog", lambda payload: calls.append("catalog"))
+    bus.subscribe("*", lambda payload: calls.append("flush"))
+
+    async def run():
+        await bus.dispatch({"origin": "other", "version": 1, "topic": "catalog", "payload": {}})
+        await bus.dispatch({"origin": "other", "version": 2, "topic": "catalog", "payload": {}})
+        await bus.dispatch({"origin": "other", "version": 5, "topic": "catalog", "payload": {}})
+        await bus.dispatch({"origin": "me", "version": 9, "topic": "catalog", "payload": {}})
+
+    asyncio.run(run())
+    assert calls == ["catalog", "catalog", "flush", "catalog"]
+
+
+def test_cache_falls_back_to_short_ttl_when_bus_is_down(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cachebus.time, "monotonic", lambda: now[0])
+    healthy = [True]
+    cache = CoherentCache(lambda: healthy[0], ttl=3600, degraded_ttl=30)
+
+    cache["subjects"] = ["a"]
+    now[0] += 60
+    assert cache.get("subjects") == ["a"]
+
+    healthy[0] = False
+    assert cache.get("subjects") is None
+
+
+def test_put_drops_fill_that_raced_an_invalidation():
+    cache = CoherentCache(lambda: True)
+    generation = cache.generation
+    cache.clear()
+    cache.put("subjects", ["stale"], generation)
+    assert cache.get("subjects") is None
+
+    generation = cache.generation
+    cache.put("subjects", ["fresh"], generation)
+    assert cache.get("subjects") == ["fresh"]
+
+
+def test_catalog_fill_interleaved_with_invalidation(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    import server
+
+    subjects = [{"id": "s1", "name": "Before"}]
+    queried = asyncio.Event()
+    release = asyncio.Event()
+
+    class Cursor:
+        def __init__(self, docs):
+            self.docs = [dict(d) for d in docs]
+
+        async def to_list(self, n):
+            queried.set()
+            await release.wait()  # the write and its invalidation land here
+            return self.docs
+
+    class Subjects:
+        def find(self, query, projection=None):
+            return Cursor(subjects)
+
+    monkeypatch.setattr(server, "db", type("Db", (), {"subjects": Subjects()})())
+    monkeypatch.setattr(server, "catalog_cache", CoherentCache(lambda: True))
+
+    async def run():
+        fill = asyncio.create_task(server.cached_subjects())
+        await queried.wait()
+        subjects[0]["name"] = "After"
+        server.catalog_cache.clear()
+        release.set()
+        assert (await fill)[0]["name"] == "Before"  # this caller may see the old read...
+        return await server.cached_subjects()  # ...but it was not cached
+
+    assert asyncio.run(run())[0]["name"] == "After"
+
+
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="MONGO_TEST_URL (replica set) not configured")
+def test_mongo_change_stream_bus_reaches_every_worker():
+    pytest.importorskip("motor")
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    db_name = f"cache_bus_test_{uuid.uuid4().hex[:8]}"
+    procs, received = start_workers("mongo", db_name, expected=2)
+
+    async def publish():
+        client = AsyncIOMotorClient(MONGO_TEST_URL)
+        bus = cachebus.MongoChangeStreamBus(client[db_name])
+        await bus.publish("catalog", key="subjects")
+        await bus.publish("catalog", key="models")
+        return client
+
+    client = asyncio.run(publish())
+    try:
+        results = collect(procs, received)
+    finally:
+        asyncio.run(AsyncIOMotorClient(MONGO_TEST_URL).drop_database(db_name))
+        client.close()
+
+    assert len(results) == WORKERS
+    for seen in results.values():
+        assert seen == [{"key": "subjects"}, {"key": "models"}]
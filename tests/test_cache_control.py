@@ -0,0 +1,50 @@
+"""Cache-Control policies and ETag revalidation (backend/middleware.py)."""
+import pytest
+
+pytest.importorskip("starlette")
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from middleware import CacheControlMiddleware, CompressionMiddleware  # noqa: E402
+
+catalog = {"subjects": [{"id": i, "name": f"Subject {i}"} for i in range(100)]}
+
+
+async def subjects(request):
+    return JSONResponse(catalog["subjects"])
+
+
+def make_client():
+    app = Starlette(routes=[Route("/api/subjects", subjects), Route("/api/thumbnails/x", subjects)])
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    app.add_middleware(CacheControlMiddleware, policies=[
+        ("/api/thumbnails", "public, max-age=31536000, immutable", None),
+        ("/api/subjects", "private, no-cache", "Accept-Encoding"),
+    ], default=("private, no-store", "Authorization"))
+    return TestClient(app)
+
+
+def test_catalog_is_private_and_revalidated():
+    client = make_client()
+    first = client.get("/api/subjects", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["cache-control"] == "private, no-cache"
+    etag = first.headers["etag"]
+
+    again = client.get("/api/subjects", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    catalog["subjects"] = catalog["subjects"] + [{"id": 100, "name": "New"}]
+    changed = client.get("/api/subjects", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 101
+
+
+def test_only_thumbnails_are_public():
+    client = make_client()
+    assert client.get("/api/thumbnails/x").headers["cache-control"].startswith("public")
+    assert "etag" not in client.get("/api/thumbnails/x").headers
@@ -0,0 +1,156 @@
+"""Result compaction (backend/compaction.py) must not change PerformanceStats.
+
+The unit tests fold rows with `summarize` and merge them the way
+`load_subject_counters` does. The end-to-end test runs `compact_results`
+against a real replica set (transactions need one):
+
+    MONGO_TEST_URL=mongodb://localhost:27017/?replicaSet=rs0 pytest tests/test_compaction.py
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+import compaction  # noqa: E402
+from compaction import compact_results, empty_counters, load_subject_counters, summarize  # noqa: E402
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def row(user_id, subject_id, is_correct, days_ago, time_spent=None):
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "subject_id": subject_id,
+        "is_correct": is_correct,
+        "time_spent": time_spent,
+        "created_at": (NOW - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+def random_rows(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        row(rng.choice(["u1", "u2"]), rng.choice(["s1", "s2", "s3"]), rng.random() < 0.6,
+            rng.randint(0, 400), rng.choice([None, 0, -rng.randint(1, 30), rng.randint(5, 120)]))
+        for _ in range(n)
+    ]
+
+
+def stats(counters):
+    """The figures PerformanceStats is built from."""
+    total = sum(c["total"] for c in counters.values())
+    correct = sum(c["correct"] for c in counters.values())
+    time_total = sum(c["time_spent_total"] for c in counters.values())
+    time_count = sum(c["time_spent_count"] for c in counters.values())
+    return {
+        "total": total,
+        "correct": correct,
+        "accuracy": correct / total if total else 0.0,
+        "avg_time_spent": time_total / time_count if time_count else None,
+        "subjects": {sid: (c["total"], c["correct"]) for sid, c in counters.items()},
+    }
+
+
+def raw_counters(rows, user_id):
+    """Counters straight from raw rows, without going through summarize."""
+    counters = {}
+    for r in rows:
+        if r["user_id"] != user_id:
+            continue
+        c = counters.setdefault(r["subject_id"], empty_counters())
+        c["total"] += 1
+        c["correct"] += r["is_correct"]
+        if r["time_spent"] is not None and r["time_spent"] > 0:
+            c["time_spent_total"] += r["time_spent"]
+            c["time_spent_count"] += 1
+    return counters
+
+
+def test_summarize_folds_rows_per_user_and_subject():
+    rows = [
+        row("u1", "s1", True, 10, time_spent=30),
+        row("u1", "s1", False, 5, time_spent=0),
+        row("u1", "s1", True, 20),
+        row("u1", "s1", False, 7, time_spent=-4),
+        row("u1", "s2", False, 1, time_spent=12),
+        row("u2", "s1", True, 3, time_spent=8),
+    ]
+    summaries = summarize(rows)
+
+    assert set(summaries) == {("u1", "s1"), ("u1", "s2"), ("u2", "s1")}
+    s = summaries[("u1", "s1")]
+    assert (s["total"], s["correct"]) == (4, 2)
+    # Zero, negative and missing time_spent are not averaged in
+    assert (s["time_spent_total"], s["time_spent_count"]) == (30, 1)
+    assert s["first_result_at"] == rows[2]["created_at"]
+    assert s["last_result_at"] == rows[1]["created_at"]
+
+
+@pytest.mark.parametrize("cutoff_days", [0, 30, 90, 500])
+def test_summaries_plus_recent_rows_match_all_raw_rows(fake_db, cutoff_days):
+    rows = random_rows(500)
+    cutoff = (NOW - timedelta(days=cutoff_days)).isoformat()
+    old = [r for r in rows if r["created_at"] < cutoff]
+    recent = [r for r in rows if r["created_at"] >= cutoff]
+
+    # Compact in uneven batches, as compact_results' $inc upserts would
+    stored = {}
+    for start in range(0, len(old), 37):
+        for key, s in summarize(old[start:start + 37]).items():
+            acc = stored.setdefault(key, empty_counters())
+            for k in acc:
+                acc[k] += s[k]
+    summary_docs = [dict(c, user_id=uid, subject_id=sid) for (uid, sid), c in stored.items()]
+
+    # The fake runs load_subject_counters' real $match/$group stages on the recent rows
+    db = fake_db(performance_summaries=summary_docs, assessment_results=recent)
+    for user_id in ("u1", "u2"):
+        merged = asyncio.run(load_subject_counters(db, user_id))
+        assert merged == raw_counters(rows, user_id)
+        assert stats(merged) == stats(raw_counters(rows, user_id))
+
+
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="MONGO_TEST_URL (replica set) not configured")
+def test_compact_results_keeps_performance_stats(monkeypatch):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    monkeypatch.setattr(compaction, "ARCHIVE_MODE", "collection")
+    db_name = f"compaction_test_{uuid.uuid4().hex[:8]}"
+    now = datetime.now(timezone.utc)
+    rows = random_rows(300)
+    for r in rows:
+        # Re-anchor to the real clock, which compact_results' cutoff uses
+        days = (NOW - datetime.fromisoformat(r["created_at"])).days
+        r["created_at"] = (now - timedelta(days=days)).isoformat()
+
+    async def run():
+        client = AsyncIOMotorClient(MONGO_TEST_URL)
+        db = client[db_name]
+        try:
+            await db.performance_summaries.create_index([("user_id", 1), ("subject_id", 1)], unique=True)
+            await db.assessment_results.insert_many([dict(r) for r in rows])
+            before = {u: await load_subject_counters(db, u) for u in ("u1", "u2")}
+            first = await compact_results(client, db, older_than_days=90, batch_size=50)
+            again = await compact_results(client, db, older_than_days=90, batch_size=50)
+            after = {u: await load_subject_counters(db, u) for u in ("u1", "u2")}
+            remaining = await db.assessment_results.count_documents({})
+            archived = await db.assessment_results_archive.count_documents({})
+            return before, after, first, again, remaining, archived
+        finally:
+            await client.drop_database(db_name)
+            client.close()
+
+    before, after, first, again, remaining, archived = asyncio.run(run())
+    # <=: a row exactly 90 days before `now` is older than compact_results' later cutoff
+    old = sum(1 for r in rows if r["created_at"] <= (now - timedelta(days=90)).isoformat())
+    assert first["archived"] == archived == old
+    assert again["archived"] == 0
+    assert remaining == len(rows) - old
+    for user_id in before:
+        assert stats(after[user_id]) == stats(before[user_id])
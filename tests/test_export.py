@@ -0,0 +1,50 @@
+"""Assessment result export (backend/export.py)."""
+import asyncio
+import csv
+import io
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+pytest.importorskip("cachetools")
+from export import ResultExporter, utc_isoformat  # noqa: E402
+
+
+def result(rid, user_id, question_id):
+    return {
+        "id": rid, "created_at": "2026-05-01T10:00:00+00:00", "user_id": user_id,
+        "subject_id": "s1", "model_id": "m1", "question_id": question_id,
+        "selected_answer": 2, "is_correct": True, "time_spent": -1,
+    }
+
+
+def test_utc_isoformat_normalises_offsets():
+    assert utc_isoformat(datetime(2026, 5, 1, 10, 0)) == "2026-05-01T10:00:00+00:00"
+    plus_two = timezone(timedelta(hours=2))
+    assert utc_isoformat(datetime(2026, 5, 1, 12, 0, tzinfo=plus_two)) == "2026-05-01T10:00:00+00:00"
+
+
+def test_csv_neutralises_formula_cells(fake_db):
+    users = [
+        {"id": "u1", "name": "=HYPERLINK(\"http://evil\")", "email": "a@school.edu"},
+        {"id": "u2", "name": "Ada Lovelace", "email": "ada@school.edu"},
+    ]
+    questions = [{"id": "q1", "question_text": "@SUM(A1:A9)"}, {"id": "q2", "question_text": "-2+3 equals?"}]
+    db = fake_db(
+        assessment_results=[result("r1", "u1", "q1"), result("r2", "u2", "q2")],
+        users=users,
+        subjects=[{"id": "s1", "name": "Anatomy"}],
+        models=[{"id": "m1", "title": "Heart"}],
+        questions=questions,
+    )
+
+    async def run():
+        return b"".join([chunk async for chunk in ResultExporter(db, {}).csv_chunks()]).decode()
+
+    rows = list(csv.DictReader(io.StringIO(asyncio.run(run()))))
+    assert rows[0]["user_name"] == "'=HYPERLINK(\"http://evil\")"
+    assert rows[0]["question_text"] == "'@SUM(A1:A9)"
+    assert rows[1]["user_name"] == "Ada Lovelace"
+    assert rows[1]["question_text"] == "'-2+3 equals?"
+    # Numbers are not text cells and stay as they are
+    assert rows[0]["time_spent"] == "-1"
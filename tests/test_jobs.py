@@ -0,0 +1,52 @@
+"""Persistent background jobs (backend/jobs.py)."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("pymongo")
+from jobs import JobScheduler  # noqa: E402
+
+
+async def start_scheduler(db):
+    scheduler = JobScheduler(db, concurrency=1, process_workers=0, poll_interval=0.01, lease_seconds=60)
+    started = asyncio.Event()
+
+    async def slow(ctx):
+        started.set()
+        await asyncio.sleep(3600)
+
+    async def quick(ctx, n):
+        return {"n": n}
+
+    scheduler.register("slow", slow)
+    scheduler.register("quick", quick)
+    await scheduler.start()
+    return scheduler, started
+
+
+def test_stop_hands_running_job_back_without_using_an_attempt(fake_db):
+    async def run():
+        scheduler, started = await start_scheduler(fake_db())
+        job = await scheduler.enqueue("slow")
+        await asyncio.wait_for(started.wait(), 1)
+        assert (await scheduler.get(job["id"]))["attempts"] == 1
+        await scheduler.stop()
+        return await scheduler.get(job["id"])
+
+    job = asyncio.run(run())
+    assert (job["status"], job["attempts"], job["owner"], job["finished_at"]) == ("queued", 0, None, None)
+
+
+def test_finished_job_is_not_handed_back(fake_db):
+    async def run():
+        scheduler, _ = await start_scheduler(fake_db())
+        job = await scheduler.enqueue("quick", n=3)
+        for _ in range(100):
+            if (await scheduler.get(job["id"]))["status"] != "queued" and not scheduler.running:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return await scheduler.get(job["id"])
+
+    job = asyncio.run(run())
+    assert (job["status"], job["attempts"], job["result"]) == ("succeeded", 1, {"n": 3})
@@ -0,0 +1,146 @@
+"""Live update fan-out: per-connection coalescing and rate limiting (backend/live.py)."""
+import asyncio
+import time
+
+import pytest
+
+from live import LiveHub, Watcher, rank_changes
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+        self.sent_at = []
+        self.incoming = asyncio.Queue()
+        self.closed = False
+
+    async def send_json(self, message):
+        if self.closed:
+            raise RuntimeError('Cannot call "send" once a close message has been sent.')
+        self.sent.append(message)
+        self.sent_at.append(time.monotonic())
+
+    async def receive_text(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise RuntimeError("disconnected")
+        return message
+
+    def disconnect(self):
+        self.incoming.put_nowait(None)
+
+
+def run(coro):
+    """Run `coro`, failing on any 'Task exception was never retrieved'."""
+    errors = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        return await coro
+
+    result = asyncio.run(main())
+    assert errors == []
+    return result
+
+
+def entry(user_id, name, accuracy):
+    return {"user_id": user_id, "name": name, "accuracy": accuracy, "total_assessments": 10}
+
+
+def test_watcher_coalesces_a_burst_into_one_message():
+    async def scenario():
+        socket = FakeSocket()
+        watcher = Watcher(socket, "u1", min_interval=0.05)
+        sender = asyncio.create_task(watcher.run())
+        watcher.push_stats_delta("s1", 1, 1)
+        watcher.push_stats_delta("s1", 1, 0)
+        watcher.push_stats_delta("s2", 1, 1)
+        watcher.push_leaderboard({"type": "leaderboard", "leaderboard": ["old"]})
+        watcher.push_leaderboard({"type": "leaderboard", "leaderboard": ["new"]})
+        await asyncio.sleep(0.02)
+        sender.cancel()
+        return socket.sent
+
+    assert run(scenario()) == [
+        {"type": "stats_delta", "total": 3, "correct": 2,
+         "subjects": {"s1": {"total": 2, "correct": 1}, "s2": {"total": 1, "correct": 1}}},
+        {"type": "leaderboard", "leaderboard": ["new"]},
+    ]
+
+
+def test_watcher_rate_limits_sends():
+    async def scenario():
+        socket = FakeSocket()
+        watcher = Watcher(socket, "u1", min_interval=0.1)
+        sender = asyncio.create_task(watcher.run())
+        watcher.push_stats_delta("s1", 1, 1)
+        await asyncio.sleep(0.01)
+        # Arrives inside the interval: held back, then merged with the next one
+        watcher.push_stats_delta("s1", 1, 1)
+        await asyncio.sleep(0.01)
+        watcher.push_stats_delta("s1", 1, 0)
+        await asyncio.sleep(0.15)
+        sender.cancel()
+        return socket
+
+    socket = run(scenario())
+    assert [m["total"] for m in socket.sent] == [1, 2]
+    assert socket.sent_at[1] - socket.sent_at[0] >= 0.09
+
+
+def test_hub_sends_deltas_only_to_the_submitting_user():
+    loads = []
+
+    async def load_leaderboard(limit):
+        loads.append(limit)
+        return [entry("u2", "Grace", 90.0), entry("u1", "Ada", 80.0)]
+
+    async def scenario():
+        hub = LiveHub(load_leaderboard, refresh_interval=0.02)
+        ada, grace = FakeSocket(), FakeSocket()
+        serving = [asyncio.create_task(hub.serve(ada, "u1")), asyncio.create_task(hub.serve(grace, "u2"))]
+        await asyncio.sleep(0)
+        for _ in range(3):
+            hub.notify_submission("u1", "s1", True)
+        await asyncio.sleep(0.05)
+        ada.disconnect()
+        grace.disconnect()
+        await asyncio.gather(*serving)
+        assert hub.watchers == {}
+        return ada.sent, grace.sent
+
+    ada, grace = run(scenario())
+    # Three submissions inside the refresh window: one recompute
+    assert len(loads) == 1
+    # Ada's leaderboard update may still be held back by her rate limit
+    assert ada[0] == {"type": "stats_delta", "total": 3, "correct": 3, "subjects": {"s1": {"total": 3, "correct": 3}}}
+    assert all(m["type"] == "leaderboard" for m in ada[1:])
+    assert [m["type"] for m in grace] == ["leaderboard"]
+    assert grace[0]["changes"][0] == {"user_id": "u2", "name": "Grace", "old_rank": None, "new_rank": 1}
+
+
+def test_failed_send_ends_the_connection():
+    async def scenario():
+        hub = LiveHub(None, refresh_interval=0)
+        socket = FakeSocket()
+        socket.closed = True
+        serving = asyncio.create_task(hub.serve(socket, "u1"))
+        await asyncio.sleep(0)
+        hub.notify_submission("u1", "s1", True)
+        # serve returns without the client ever disconnecting its receive side
+        await asyncio.wait_for(serving, 1)
+        assert hub.watchers == {}
+        await hub._refresh_task  # nobody left watching: no recompute
+
+    run(scenario())
+
+
+def test_rank_changes_are_keyed_by_user_id():
+    old = [entry("u1", "Sam", 90.0), entry("u2", "Sam", 80.0), entry("u3", "Lee", 70.0)]
+    new = [entry("u2", "Sam", 95.0), entry("u1", "Sam", 90.0), entry("u4", "Kim", 75.0)]
+    assert rank_changes(old, new) == [
+        {"user_id": "u2", "name": "Sam", "old_rank": 2, "new_rank": 1},
+        {"user_id": "u1", "name": "Sam", "old_rank": 1, "new_rank": 2},
+        {"user_id": "u4", "name": "Kim", "old_rank": None, "new_rank": 3},
+    ]
+    assert rank_changes(old, old) == []
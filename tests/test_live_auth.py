@@ -0,0 +1,60 @@
+"""WebSocket authentication for /api/ws/live (backend/server.py)."""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+from fastapi import HTTPException  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+from starlette.websockets import WebSocketDisconnect  # noqa: E402
+
+import server  # noqa: E402
+
+
+class EchoHub:
+    async def serve(self, websocket, user_id):
+        await websocket.send_json({"user_id": user_id})
+        await websocket.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def user_from_token(token):
+        if token != "good":
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return SimpleNamespace(id="u1")
+
+    monkeypatch.setattr(server, "user_from_token", user_from_token)
+    monkeypatch.setattr(server, "live_hub", EchoHub())
+    monkeypatch.setattr(server, "LIVE_AUTH_TIMEOUT_SECONDS", 0.2)
+    return TestClient(server.app)
+
+
+def test_token_in_first_message(client):
+    with client.websocket_connect("/api/ws/live") as ws:
+        ws.send_json({"type": "auth", "token": "good"})
+        assert ws.receive_json() == {"user_id": "u1"}
+
+
+@pytest.mark.parametrize("message", [
+    {"type": "auth", "token": "bad"},
+    {"type": "hello"},
+    "not json",
+])
+def test_invalid_auth_closes_with_policy_violation(client, message):
+    with client.websocket_connect("/api/ws/live") as ws:
+        if isinstance(message, dict):
+            ws.send_json(message)
+        else:
+            ws.send_text(message)
+        with pytest.raises(WebSocketDisconnect) as e:
+            ws.receive_json()
+    assert e.value.code == 1008
+
+
+def test_query_token_is_not_accepted(client):
+    with client.websocket_connect("/api/ws/live?token=good") as ws:
+        with pytest.raises(WebSocketDisconnect) as e:
+            ws.receive_json()  # nothing sent: times out
+    assert e.value.code == 1008
@@ -0,0 +1,121 @@
+"""Token-bucket rate limiting for the auth routes (backend/ratelimit.py)."""
+from types import SimpleNamespace
+
+import pytest
+
+from ratelimit import RateLimiter
+
+
+def test_burst_then_refill():
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+    assert [limiter.acquire("k", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("k", now=0) > 0
+    # One token per second at 60/min
+    assert limiter.acquire("k", now=1.0) == 0
+    assert limiter.acquire("k", now=1.0) > 0
+    # Refill is capped at the burst size
+    assert [limiter.acquire("k", now=100) for _ in range(4)] == [0, 0, 0, pytest.approx(1.0)]
+
+
+def test_retry_after_is_time_until_next_token():
+    limiter = RateLimiter(rate_per_minute=30, burst=1)  # one token every 2s
+    assert limiter.acquire("k", now=0) == 0
+    assert limiter.acquire("k", now=0) == pytest.approx(2.0)
+    assert limiter.acquire("k", now=1.5) == pytest.approx(0.5)
+    assert limiter.acquire("k", now=2.0) == 0
+
+
+def test_keys_are_independent():
+    limiter = RateLimiter(rate_per_minute=60, burst=1)
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) > 0
+    assert limiter.acquire("b", now=0) == 0
+
+
+def test_sweep_drops_only_refilled_buckets():
+    limiter = RateLimiter(rate_per_minute=60, burst=10, sweep_interval=5)  # full after 10s idle
+    limiter.acquire("idle", now=0)
+    limiter.acquire("busy", now=8)
+    limiter.sweep(now=11)
+    assert set(limiter.buckets) == {"busy"}
+
+
+def test_sweep_runs_on_interval_and_when_saturated():
+    limiter = RateLimiter(rate_per_minute=1, burst=1, max_keys=4, sweep_interval=1000)
+    for i in range(4):
+        limiter.acquire(f"k{i}", now=i)
+    # Full: nothing has refilled yet, so the least recently used half goes
+    limiter.acquire("new", now=4)
+    assert set(limiter.buckets) == {"k2", "k3", "new"}
+
+    limiter = RateLimiter(rate_per_minute=60, burst=1, sweep_interval=5)
+    limiter._next_sweep = 5
+    limiter.acquire("old", now=0)
+    limiter.acquire("other", now=6)
+    assert "old" not in limiter.buckets
+
+
+def test_blocked_ip_does_not_drain_email_bucket(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    import server
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(server, "ip_limiter", RateLimiter(rate_per_minute=1, burst=1))
+    monkeypatch.setattr(server, "email_limiter", RateLimiter(rate_per_minute=1, burst=2))
+    attacker = SimpleNamespace(headers={}, client=SimpleNamespace(host="10.0.0.1"))
+    student = SimpleNamespace(headers={}, client=SimpleNamespace(host="10.0.0.2"))
+
+    server.check_auth_rate_limit(attacker, "Victim@school.edu")
+    for _ in range(5):
+        with pytest.raises(HTTPException) as e:
+            server.check_auth_rate_limit(attacker, "victim@school.edu")
+        assert e.value.status_code == 429
+        assert int(e.value.headers["Retry-After"]) >= 1
+
+    # The victim still has the token the refused requests didn't take
+    server.check_auth_rate_limit(student, "victim@school.edu")
+
+
+@pytest.mark.parametrize("proxies, header, expected", [
+    (1, "203.0.113.7", "203.0.113.7"),
+    # Whatever the client puts first, the proxy appends the real address last
+    (1, "1.2.3.4, 203.0.113.7", "203.0.113.7"),
+    (1, "9.9.9.9, 1.2.3.4,203.0.113.7", "203.0.113.7"),
+    (2, "1.2.3.4, 203.0.113.7, 10.0.0.5", "203.0.113.7"),
+    # Fewer entries than proxies: not forwarded by them, use the peer
+    (2, "1.2.3.4", "10.0.0.9"),
+])
+def test_client_ip_ignores_spoofed_forwarded_entries(monkeypatch, proxies, header, expected):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    import server
+    from starlette.datastructures import Headers
+
+    monkeypatch.setattr(server, "TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr(server, "TRUSTED_PROXY_COUNT", proxies)
+    request = SimpleNamespace(headers=Headers({"x-forwarded-for": header}), client=SimpleNamespace(host="10.0.0.9"))
+    assert server.client_ip(request) == expected
+
+
+def test_rotating_spoofed_forwarded_for_shares_one_bucket(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    import server
+    from fastapi import HTTPException
+    from starlette.datastructures import Headers
+
+    monkeypatch.setattr(server, "TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr(server, "TRUSTED_PROXY_COUNT", 1)
+    monkeypatch.setattr(server, "ip_limiter", RateLimiter(rate_per_minute=1, burst=2))
+    monkeypatch.setattr(server, "email_limiter", RateLimiter(rate_per_minute=60, burst=100))
+
+    def request(spoofed):
+        headers = Headers({"x-forwarded-for": f"{spoofed}, 198.51.100.4"})
+        return SimpleNamespace(headers=headers, client=SimpleNamespace(host="10.0.0.1"))
+
+    server.check_auth_rate_limit(request("1.1.1.1"), "a@school.edu")
+    server.check_auth_rate_limit(request("2.2.2.2"), "b@school.edu")
+    with pytest.raises(HTTPException) as e:
+        server.check_auth_rate_limit(request("3.3.3.3"), "c@school.edu")
+    assert e.value.status_code == 429
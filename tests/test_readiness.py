@@ -0,0 +1,34 @@
+"""Startup configuration and the readiness probe (backend/database.py, backend/server.py)."""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+import database  # noqa: E402
+import server  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+
+def test_create_client_requires_mongo_url(monkeypatch):
+    monkeypatch.setattr(database, "MONGO_URL", "")
+    with pytest.raises(RuntimeError, match="MONGO_URL"):
+        database.create_client()
+
+
+def test_readyz_does_not_expose_driver_errors(monkeypatch):
+    async def ping(client):
+        raise ConnectionError("db-0.internal.example:27017: connection refused (replicaSet rs0)")
+
+    monkeypatch.setattr(server, "ready", True)
+    monkeypatch.setattr(server, "ping", ping)
+    response = TestClient(server.app).get("/readyz")
+    assert response.status_code == 503
+    assert response.json() == {"status": "db_unavailable"}
+
+
+def test_readyz_reports_ping(monkeypatch):
+    async def ping(client):
+        return 1.234
+
+    monkeypatch.setattr(server, "ready", True)
+    monkeypatch.setattr(server, "ping", ping)
+    assert TestClient(server.app).get("/readyz").json() == {"status": "ready", "db_ping_ms": 1.23}
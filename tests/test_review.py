@@ -0,0 +1,100 @@
+"""Spaced-repetition scheduling (backend/review.py)."""
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+pytest.importorskip("cachetools")
+from review import MIN_EASE, RELEARN_MINUTES, ReviewScheduler, answer_quality, next_schedule  # noqa: E402
+
+NOW = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def question(qid):
+    return {"id": qid, "model_id": "m1", "subject_id": "s1"}
+
+
+def test_answer_quality():
+    assert answer_quality(False) == 1
+    assert answer_quality(True) == 4
+    assert answer_quality(True, time_spent=8) == 5
+    assert answer_quality(True, time_spent=30) == 4
+
+
+def test_intervals_grow_one_six_then_by_ease():
+    schedule = {}
+    expected = [(1, 2.5), (6, 2.5), (15, 2.5), (37.5, 2.5)]
+    for interval_days, ease in expected:
+        interval, new_ease, repetitions, lapses, due_at = next_schedule(schedule, 4, NOW)
+        assert (interval, new_ease, lapses) == (interval_days, ease, 0)
+        assert due_at == NOW + timedelta(days=interval_days)
+        schedule = {"interval_days": interval, "ease": new_ease, "repetitions": repetitions, "lapses": lapses}
+
+
+def test_ease_rises_on_easy_answers():
+    assert next_schedule({}, 5, NOW)[1] == 2.6
+    assert next_schedule({"ease": 2.6, "repetitions": 1, "interval_days": 1}, 5, NOW)[1] == 2.7
+
+
+def test_wrong_answer_relearns_soon_and_lowers_ease():
+    schedule = {"interval_days": 15, "ease": 2.5, "repetitions": 3, "lapses": 0}
+    interval, ease, repetitions, lapses, due_at = next_schedule(schedule, 1, NOW)
+    assert (interval, repetitions, lapses) == (0, 0, 1)
+    assert ease == pytest.approx(1.96)
+    assert due_at == NOW + timedelta(minutes=RELEARN_MINUTES)
+    # Back to the 1-day step after relearning
+    assert next_schedule({"interval_days": 0, "ease": ease, "repetitions": 0, "lapses": 1}, 4, NOW)[0] == 1
+
+
+def test_ease_never_drops_below_minimum():
+    schedule = {}
+    for _ in range(10):
+        interval, ease, repetitions, lapses, _ = next_schedule(schedule, 1, NOW)
+        schedule = {"interval_days": interval, "ease": ease, "repetitions": repetitions, "lapses": lapses}
+    assert schedule["ease"] == MIN_EASE
+    assert schedule["lapses"] == 10
+
+
+def test_due_returns_earliest_first_and_skips_stale_entries(fake_db):
+    reviews = ReviewScheduler(fake_db())
+
+    async def run():
+        await reviews.record("u1", question("q1"), False, now=NOW)  # due in 10 minutes
+        await reviews.record("u1", question("q2"), False, now=NOW + timedelta(minutes=1))
+        await reviews.record("u1", question("q3"), True, now=NOW)  # due tomorrow
+        assert "u1" in reviews.heaps
+
+        later = NOW + timedelta(hours=1)
+        assert [qid for qid, _ in await reviews.due("u1", now=later)] == ["q1", "q2"]
+        # Reading doesn't consume
+        assert [qid for qid, _ in await reviews.due("u1", now=later)] == ["q1", "q2"]
+
+        # q1 answered correctly: its old heap entry is stale and must be skipped
+        await reviews.record("u1", question("q1"), True, now=later)
+        assert [qid for qid, _ in await reviews.due("u1", now=later)] == ["q2"]
+        assert [qid for qid, _ in await reviews.due("u1", limit=1, now=NOW + timedelta(days=3))] == ["q2"]
+
+        # The heap path and the cold (indexed query) path agree
+        hot = await reviews.due("u1", now=NOW + timedelta(days=3))
+        reviews.forget("u1")
+        cold = await reviews.due("u1", now=NOW + timedelta(days=3))
+        assert hot == cold
+        assert [qid for qid, _ in hot] == ["q2", "q3", "q1"]
+
+    asyncio.run(run())
+
+
+def test_heap_is_rebuilt_when_stale_entries_pile_up(fake_db):
+    reviews = ReviewScheduler(fake_db())
+
+    async def run():
+        await reviews.record("u1", question("q1"), True, now=NOW)
+        await reviews.record("u1", question("q2"), True, now=NOW)
+        for i in range(20):
+            await reviews.record("u1", question("q1"), i % 2 == 0, now=NOW + timedelta(minutes=i))
+            heap, current = reviews.heaps["u1"]
+            assert len(heap) <= 2 * len(current)
+        heap, current = reviews.heaps["u1"]
+        assert sorted(qid for due_at, qid in heap if current[qid] == due_at) == ["q1", "q2"]
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+"""Catalog search index (backend/search.py)."""
+import pytest
+
+import search
+from search import SearchIndex
+
+
+def ids(results):
+    return [(r["type"], r["id"]) for r in results]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add_subject({"id": "s1", "name": "Human Anatomy", "description": "The heart, the eye and the brain"})
+    index.add_subject({"id": "s2", "name": "Mechanical Engineering", "description": "Engines and gearboxes"})
+    index.add_model({"id": "m1", "subject_id": "s1", "title": "Human Heart", "labels": ["atrium", "ventricle"],
+                     "description": "Four chambers"})
+    index.add_model({"id": "m2", "subject_id": "s1", "title": "Human Eye", "labels": ["retina", "lens"]})
+    index.add_model({"id": "m3", "subject_id": "s2", "title": "Car Engine", "labels": ["piston", "heat"]})
+    index.add_question({"id": "q1", "subject_id": "s1", "model_id": "m1", "question_text": "How many chambers does the heart have?",
+                        "options": ["Two", "Three", "Four", "Five"]})
+    return index
+
+
+def test_last_term_is_a_prefix(index):
+    assert index.expand_prefix("he") == ["heart", "heat"]
+    assert set(ids(index.search("hear"))) == {("subject", "s1"), ("model", "m1"), ("question", "q1")}
+    # Earlier terms must match exactly: "hum" adds nothing here
+    assert ids(index.search("hum")) == ids(index.search("human"))
+    assert index.search("hum eye") == index.search("eye")
+    assert ids(index.search("human ey"))[0] == ("model", "m2")
+
+
+def test_short_prefixes_match_exactly(index):
+    index.add_model({"id": "m4", "subject_id": "s1", "title": "Vitamin A", "labels": []})
+    assert index.expand_prefix("a") == ["a"]
+    assert ids(index.search("a")) == [("model", "m4")]
+    assert index.expand_prefix("x") == []
+
+
+def test_prefix_expansion_is_capped(monkeypatch):
+    monkeypatch.setattr(search, "MAX_PREFIX_EXPANSIONS", 3)
+    index = SearchIndex()
+    for i in range(10):
+        index.add("model", str(i), f"term{i}")
+    assert index.expand_prefix("term") == ["term0", "term1", "term2"]
+
+
+def test_remove_and_readd_clean_up_vocabulary(index):
+    index.remove("model", "m3")
+    assert "piston" not in index.vocabulary and "piston" not in index.postings
+    assert index.expand_prefix("he") == ["heart"]  # "heat" only came from m3
+    assert "engine" not in index.vocabulary  # s2 says "engines", not "engine"
+    assert ids(index.search("piston")) == []
+    assert len(index) == 5
+
+    # Re-adding under the same id replaces the old terms instead of merging
+    index.add_model({"id": "m1", "subject_id": "s1", "title": "Human Lung", "labels": []})
+    assert "atrium" not in index.vocabulary and "ventricle" not in index.vocabulary
+    assert ("model", "m1") not in index.postings["heart"]
+    assert ids(index.search("lung")) == [("model", "m1")]
+    assert index.vocabulary == sorted(index.vocabulary)
+    assert index.total_length == sum(index.doc_lengths.values())
+
+    index.remove("model", "missing")  # no-op
+    assert len(index) == 5
+
+
+def test_type_filter(index):
+    assert ids(index.search("heart", types={"question"})) == [("question", "q1")]
+    assert set(ids(index.search("heart", types={"model", "subject"}))) == {("model", "m1"), ("subject", "s1")}
+    assert index.search("heart", types={"model"})[0]["subject_id"] == "s1"
+
+
+def test_ranking_order():
+    index = SearchIndex()
+    index.add("model", "body", "Organs", body="valve")
+    index.add("model", "label", "Organs", labels=["valve"])
+    index.add("model", "title", "Valve")
+    index.add("model", "other", "Lungs")
+    # Title beats label beats body; documents without the term are not returned
+    assert ids(index.search("valve")) == [("model", "title"), ("model", "label"), ("model", "body")]
+    assert ids(index.search("valve", limit=2)) == [("model", "title"), ("model", "label")]
+
+    # A rarer term weighs more than a common one
+    index = SearchIndex()
+    index.add("question", "rare", "common rare")
+    index.add("question", "common", "common common")
+    for i in range(5):
+        index.add("question", f"filler{i}", "common")
+    assert ids(index.search("common rare"))[0] == ("question", "rare")
+    results = index.search("common rare")
+    assert results == sorted(results, key=lambda r: -r["score"])
+
+
+def test_empty_queries(index):
+    assert index.search("") == []
+    assert index.search("?!") == []
+    assert SearchIndex().search("heart") == []
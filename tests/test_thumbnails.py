@@ -0,0 +1,106 @@
+"""glTF parsing and thumbnail rendering (backend/thumbnails.py)."""
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+pytest.importorskip("requests")
+import thumbnails  # noqa: E402
+from thumbnails import GLTFAsset, ThumbnailError, collect_primitives, fetch, parse_glb, read_uri, render  # noqa: E402
+
+EYE_URL = "/models3d/human_eye.glb"
+
+
+def test_parse_glb():
+    gltf, bin_chunk = parse_glb(fetch(EYE_URL))
+    assert gltf["asset"]["version"] == "2.0"
+    assert gltf["meshes"] and gltf["accessors"]
+    assert len(bin_chunk) >= gltf["buffers"][0]["byteLength"]
+
+
+def test_render_smoke():
+    primitives = collect_primitives(GLTFAsset(fetch(EYE_URL), EYE_URL))
+    rgba = render(primitives, size=64)
+    assert rgba.shape == (64, 64, 4)
+    alpha = rgba[:, :, 3]
+    # The model is drawn, centred, on a transparent background
+    assert (alpha > 0).mean() > 0.05
+    assert alpha[0, 0] == 0 and alpha[32, 32] > 0
+    assert rgba[:, :, :3][alpha > 0].max() > 0
+
+
+def test_render_thumbnail_is_content_addressed(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_DIR", tmp_path)
+    first = thumbnails.render_thumbnail(EYE_URL, size=32, fmt="png")
+    assert thumbnails.render_thumbnail(EYE_URL, size=32, fmt="png") == first
+    assert [p.name for p in tmp_path.iterdir()] == [first]
+
+
+@pytest.mark.parametrize("uri", [
+    "http://169.254.169.254/latest/meta-data",
+    "https://example.com/buffer.bin",
+    "//169.254.169.254/buffer.bin",
+    "file:///etc/passwd",
+    "/etc/passwd",
+    "../secret.bin",
+    "textures/../../secret.bin",
+    "%2e%2e/secret.bin",
+    "..\\secret.bin",
+])
+def test_read_uri_rejects_uris_outside_the_model_directory(monkeypatch, uri):
+    monkeypatch.setattr(thumbnails, "fetch", lambda url, **kwargs: pytest.fail(f"fetched {url}"))
+    with pytest.raises(ThumbnailError):
+        read_uri(uri, "https://models.example.com/duck/glTF/Duck.gltf")
+
+
+def test_read_uri_resolves_relative_uris(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(thumbnails, "fetch", lambda url, **kwargs: fetched.append((url, kwargs)) or b"x")
+    read_uri("Duck0.bin", "https://models.example.com/duck/glTF/Duck.gltf")
+    read_uri("textures/duck%20cm.png", "https://models.example.com/duck/glTF/Duck.gltf")
+    read_uri("eye.bin", "/models3d/eye.gltf")
+    assert fetched == [
+        ("https://models.example.com/duck/glTF/Duck0.bin", {"follow_redirects": False}),
+        ("https://models.example.com/duck/glTF/textures/duck%20cm.png", {"follow_redirects": False}),
+        ("/models3d/eye.bin", {"follow_redirects": False}),
+    ]
+    assert read_uri("data:application/octet-stream;base64,AAEC", "/models3d/eye.gltf") == b"\x00\x01\x02"
+
+
+class FakeResponse:
+    is_redirect = False
+
+    def __init__(self, size, content_length=None):
+        self.size = size
+        self.headers = {} if content_length is None else {"Content-Length": str(content_length)}
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        while self.read < self.size:
+            n = min(chunk_size, self.size - self.read)
+            self.read += n
+            yield b"x" * n
+
+
+def test_fetch_stops_reading_at_the_size_limit(monkeypatch):
+    monkeypatch.setattr(thumbnails, "ASSET_MAX_BYTES", 100_000)
+    response = FakeResponse(10_000_000)
+    monkeypatch.setattr(thumbnails.requests, "get", lambda url, **kwargs: response)
+    with pytest.raises(ThumbnailError):
+        fetch("https://models.example.com/big.glb")
+    assert response.read < 200_000
+
+    monkeypatch.setattr(thumbnails.requests, "get", lambda url, **kwargs: FakeResponse(10, content_length=10_000_000))
+    with pytest.raises(ThumbnailError):
+        fetch("https://models.example.com/big.glb")
+
+    monkeypatch.setattr(thumbnails.requests, "get", lambda url, **kwargs: FakeResponse(50_000))
+    assert len(fetch("https://models.example.com/small.glb")) == 50_000
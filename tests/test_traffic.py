@@ -0,0 +1,86 @@
+"""Traffic capture redaction and capture files (backend/traffic.py)."""
+import asyncio
+import gzip
+import json
+from urllib.parse import parse_qs
+
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("starlette")
+import traffic  # noqa: E402
+from traffic import REPLAY_PASSWORD, TrafficRecorder, read_capture, redact, redact_query  # noqa: E402
+
+
+def test_redact_register_body():
+    body = {"email": "Ada@School.edu", "password": "hunter2", "name": "Ada Lovelace", "role": "student"}
+    redacted = redact(body)
+    assert redacted["password"] == REPLAY_PASSWORD
+    assert redacted["email"].endswith("@replay.invalid")
+    assert redacted["name"].startswith("name-") and "Ada" not in redacted["name"]
+    assert redacted["role"] == "student"
+    assert "Ada" not in json.dumps(redacted) and "hunter2" not in json.dumps(redacted)
+
+
+def test_redact_is_stable_so_replayed_logins_match():
+    register = redact({"email": "ada@school.edu", "password": "a", "name": "Ada"})
+    login = redact({"email": "ADA@school.edu", "password": "b"})
+    assert register["email"] == login["email"]
+    assert register["password"] == login["password"]
+    assert redact({"name": "Ada"}) == {"name": register["name"]}
+
+
+def test_redact_nested_values():
+    body = {"students": [{"Name": "Grace", "contact": "grace@school.edu"}], "Token": "abc", "answers": [1, 2]}
+    redacted = redact(body)
+    assert redacted["students"][0]["Name"].startswith("name-")
+    assert redacted["students"][0]["contact"].endswith("@replay.invalid")
+    assert redacted["Token"] == REPLAY_PASSWORD
+    assert redacted["answers"] == [1, 2]
+
+
+def test_personal_keys_are_configurable(monkeypatch):
+    monkeypatch.setattr(traffic, "TRAFFIC_PERSONAL_KEYS", {"nickname"})
+    redacted = redact({"nickname": "Ada", "name": "Biology"})
+    assert redacted["nickname"].startswith("nickname-")
+    assert redacted["name"] == "Biology"
+
+
+def test_redact_query():
+    assert redact_query("") == ""
+    query = parse_qs(redact_query("token=eyJabc&lang=fr&email=ada%40school.edu&name=Ada&limit=10"))
+    assert query["token"] == [REPLAY_PASSWORD]
+    assert query["lang"] == ["fr"]
+    assert query["email"][0].endswith("@replay.invalid")
+    assert query["name"][0].startswith("name-")
+    assert query["limit"] == ["10"]
+
+
+def test_read_capture_merges_workers_in_arrival_order(tmp_path):
+    first = TrafficRecorder(directory=tmp_path, flush_records=1000)
+    second = TrafficRecorder(directory=tmp_path, flush_records=1000)
+    second.path = tmp_path / "capture-other-host-1.jsonl.gz"
+
+    async def run():
+        # Two flushes from one worker: two gzip members in one file
+        first.record({"ts": 1.0, "path": "/a"})
+        first.record({"ts": 4.0, "path": "/d"})
+        await first.flush()
+        first.record({"ts": 5.0, "path": "/e"})
+        await first.flush()
+        second.record({"ts": 2.0, "path": "/b"})
+        second.record({"ts": 3.0, "path": "/c"})
+        await second.flush()
+
+    asyncio.run(run())
+    (tmp_path / "notes.txt").write_text("not a capture file")
+
+    assert [r["path"] for r in read_capture([tmp_path])] == ["/a", "/b", "/c", "/d", "/e"]
+    assert [r["path"] for r in read_capture([second.path])] == ["/b", "/c"]
+
+
+def test_read_capture_skips_blank_lines(tmp_path):
+    path = tmp_path / "capture-x-1.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        f.write('{"ts": 2, "path": "/b"}\n\n{"ts": 1, "path": "/a"}\n')
+    assert [r["path"] for r in read_capture([path])] == ["/a", "/b"]
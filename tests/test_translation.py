@@ -0,0 +1,45 @@
+"""Model description translation (backend/translation.py)."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("cachetools")
+import translation  # noqa: E402
+from translation import MyMemoryProvider, TranslationService  # noqa: E402
+
+
+class Response:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_mymemory_errors_are_raised_not_returned(monkeypatch):
+    body = {"responseStatus": 403, "responseDetails": "'XX' IS AN INVALID TARGET LANGUAGE",
+            "responseData": {"translatedText": "'XX' IS AN INVALID TARGET LANGUAGE"}}
+    monkeypatch.setattr(translation.requests, "get", lambda *a, **k: Response(body))
+    with pytest.raises(RuntimeError, match="403"):
+        MyMemoryProvider()._translate("Heart", "en", "xx")
+
+    body = {"responseStatus": 200, "responseData": {"translatedText": "இதயம்"}}
+    monkeypatch.setattr(translation.requests, "get", lambda *a, **k: Response(body))
+    assert MyMemoryProvider()._translate("Heart", "en", "ta") == "இதயம்"
+
+
+def test_unsupported_language_never_reaches_provider_or_db(monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_LANGUAGES", ["ta"])
+
+    class Unreachable:
+        def __getattr__(self, name):
+            raise AssertionError(f"unexpected access to {name}")
+
+    service = TranslationService(Unreachable(), Unreachable())
+    with pytest.raises(ValueError):
+        asyncio.run(service.ensure("m1", "Heart", "zz"))
+    assert asyncio.run(service.ensure("m1", "Heart", "en")) == "Heart"